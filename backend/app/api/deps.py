@@ -0,0 +1,92 @@
+"""
+Shared FastAPI dependencies for API routes
+"""
+
+from fastapi import Query
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from typing import Any, Optional, Tuple, Type, TypeVar
+from datetime import date
+from functools import lru_cache
+
+from app.schemas.orders import OrderSearch, OrderStatus, OrderUrgency
+from app.schemas.patients import PatientSearch
+
+
+SearchModel = TypeVar("SearchModel", bound=BaseModel)
+
+
+def _validate_query(model: Type[SearchModel], params: Tuple[Tuple[str, Any], ...]) -> SearchModel:
+    """Validate query parameters into a model, reporting failures as a 422"""
+    try:
+        return model.model_validate({name: value for name, value in params if value is not None})
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("query", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+# Search models are frozen, so one validated instance is shared by every request
+# with the same filters (e.g. a dashboard polling the same list)
+@lru_cache(maxsize=1024)
+def _parse_order_search(params: Tuple[Tuple[str, Any], ...]) -> OrderSearch:
+    """Validate order search parameters, reusing results for repeated queries"""
+    return _validate_query(OrderSearch, params)
+
+
+@lru_cache(maxsize=1024)
+def _parse_patient_search(params: Tuple[Tuple[str, Any], ...]) -> PatientSearch:
+    """Validate patient search parameters, reusing results for repeated queries"""
+    return _validate_query(PatientSearch, params)
+
+
+def get_order_search(
+    medication_id: Optional[str] = Query(None),
+    ordered_by: Optional[str] = Query(None),
+    status: Optional[OrderStatus] = Query(None),
+    urgency: Optional[OrderUrgency] = Query(None),
+    patient_id: Optional[str] = Query(None),
+    prescription_id: Optional[str] = Query(None),
+    department: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    needed_by_from: Optional[date] = Query(None),
+    needed_by_to: Optional[date] = Query(None),
+    search: Optional[str] = Query(None, description="Search in notes, special instructions")
+) -> OrderSearch:
+    """Dependency that builds OrderSearch from the query string"""
+    return _parse_order_search((
+        ("medication_id", medication_id),
+        ("ordered_by", ordered_by),
+        ("status", status),
+        ("urgency", urgency),
+        ("patient_id", patient_id),
+        ("prescription_id", prescription_id),
+        ("department", department),
+        ("date_from", date_from),
+        ("date_to", date_to),
+        ("needed_by_from", needed_by_from),
+        ("needed_by_to", needed_by_to),
+        ("search", search),
+    ))
+
+
+def get_patient_search(
+    query: Optional[str] = Query(None, description="Search query (name, email, phone)"),
+    blood_type: Optional[str] = Query(None, pattern="^(A|B|AB|O)[+-]$"),
+    has_allergies: Optional[bool] = Query(None, description="Filter by allergies presence"),
+    allergy_type: Optional[str] = Query(None, description="Filter by specific allergy"),
+    age_min: Optional[int] = Query(None, ge=0, le=150, description="Minimum age"),
+    age_max: Optional[int] = Query(None, ge=0, le=150, description="Maximum age"),
+    chronic_condition: Optional[str] = Query(None, description="Filter by chronic condition")
+) -> PatientSearch:
+    """Dependency that builds PatientSearch from the query string"""
+    return _parse_patient_search((
+        ("query", query),
+        ("blood_type", blood_type),
+        ("has_allergies", has_allergies),
+        ("allergy_type", allergy_type),
+        ("age_min", age_min),
+        ("age_max", age_max),
+        ("chronic_condition", chronic_condition),
+    ))
@@ -61,6 +61,10 @@ class Settings(BaseSettings):
     # WebSocket
     websocket_ping_interval: int = 20
     websocket_ping_timeout: int = 10
+    # Off: compressing every broadcast separately for each connection costs far more CPU than it saves
+    websocket_per_message_deflate: bool = False
+    # Relay broadcasts between uvicorn workers over Redis pub/sub (redis_url)
+    websocket_broadcast_bus: bool = False
     
     # Logging
     log_level: str = "INFO"
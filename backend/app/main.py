@@ -17,7 +17,9 @@ from app.middleware.auth import AuthMiddleware
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.api import auth, patients, appointments, prescriptions, inventory, orders
-from app.utils.exceptions import HealthHubException, setup_exception_handlers
+from app.utils.exceptions import (
+    HealthHubException, setup_exception_handlers, set_request_timestamp, get_request_timestamp
+)
 from app.utils.websocket import websocket_manager
 
 
@@ -47,6 +49,11 @@ async def lifespan(app: FastAPI):
         raise RuntimeError("Database initialization failed")
     
     logger.info("Database initialized successfully")
+    
+    # Share WebSocket broadcasts with the other worker processes
+    if settings.websocket_broadcast_bus:
+        await websocket_manager.start_bus(settings.redis_url)
+    
     logger.info(f"Application running on {settings.host}:{settings.port}")
     
     yield
@@ -54,6 +61,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Health Ecosystem Hub Backend...")
     # Cleanup WebSocket connections
+    await websocket_manager.stop_bus()
     await websocket_manager.disconnect_all()
     logger.info("Application shutdown complete")
 
@@ -95,6 +103,7 @@ app.add_middleware(AuthMiddleware)
 async def add_process_time_header(request: Request, call_next):
     """Add processing time header to responses"""
     start_time = time.time()
+    set_request_timestamp(start_time)
     response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
@@ -208,7 +217,7 @@ async def api_info():
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket, user_id: str):
     """WebSocket endpoint for real-time updates"""
-    await websocket_manager.connect(websocket, user_id)
+    connection_id = await websocket_manager.connect(websocket, user_id)
     try:
         while True:
             # Keep connection alive
@@ -216,7 +225,7 @@ async def websocket_endpoint(websocket, user_id: str):
     except Exception as e:
         logger.error(f"WebSocket error for user {user_id}: {str(e)}")
     finally:
-        await websocket_manager.disconnect(user_id)
+        await websocket_manager.disconnect(connection_id)
 
 
 # Startup event handler
@@ -246,7 +255,7 @@ async def global_exception_handler(request: Request, exc: Exception):
             "success": False,
             "message": "Internal server error",
             "error_code": "INTERNAL_ERROR",
-            "timestamp": time.time()
+            "timestamp": get_request_timestamp()
         }
     )
 
@@ -259,5 +268,6 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        ws_per_message_deflate=settings.websocket_per_message_deflate,
         log_level=settings.log_level.lower()
     )
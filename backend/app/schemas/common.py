@@ -3,11 +3,34 @@ Common schemas used across the application
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Any, List, Generic, TypeVar
+from typing import Optional, Any, Dict, List, Generic, Mapping, Type, TypeVar
 from datetime import datetime
 from enum import Enum
 
 T = TypeVar('T')
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+
+def _row_to_dict(row: Any) -> Dict[str, Any]:
+    """Column values of a database row as a plain dict"""
+    if isinstance(row, Mapping):
+        return dict(row)
+    return {column.name: getattr(row, column.name) for column in row.__table__.columns}
+
+
+class FastORMMixin:
+    """Mixin for response schemas built straight from database rows"""
+    
+    @classmethod
+    def from_orm_fast(cls: Type[ModelT], row: Any, **joined: Any) -> ModelT:
+        """Build from a trusted database row without running validation.
+        
+        Row values must already have the field types (as returned by the ORM);
+        use model_validate for anything user supplied.
+        """
+        data = _row_to_dict(row)
+        data.update(joined)
+        return cls.model_construct(**data)
 
 
 class UserRole(str, Enum):
@@ -2,7 +2,7 @@
 Hospital orders management schemas
 """
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, model_validator
 from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
@@ -47,6 +47,9 @@ class OrderCreate(BaseModel):
         if v and v < datetime.now():
             raise ValueError('Needed by date cannot be in the past')
         return v
+    
+    class Config:
+        defer_build = True
 
 
 class OrderUpdate(BaseModel):
@@ -73,12 +76,15 @@ class OrderUpdate(BaseModel):
             raise ValueError('Needed by date cannot be in the past')
         return v
     
-    @validator('fulfilled_quantity')
-    def validate_fulfilled_quantity(cls, v, values):
+    @model_validator(mode='after')
+    def validate_fulfilled_quantity(self) -> 'OrderUpdate':
         """Validate fulfilled quantity doesn't exceed ordered quantity"""
-        if v and 'quantity' in values and v > values['quantity']:
+        if self.fulfilled_quantity is not None and self.quantity is not None and self.fulfilled_quantity > self.quantity:
             raise ValueError('Fulfilled quantity cannot exceed ordered quantity')
-        return v
+        return self
+    
+    class Config:
+        defer_build = True
 
 
 class OrderResponse(BaseModel):
@@ -116,6 +122,9 @@ class OrderResponse(BaseModel):
     
     class Config:
         from_attributes = True
+        frozen = True
+        use_enum_values = True
+        defer_build = True
 
 
 class OrderSearch(BaseModel):
@@ -132,6 +141,10 @@ class OrderSearch(BaseModel):
     needed_by_from: Optional[date] = None
     needed_by_to: Optional[date] = None
     search: Optional[str] = Field(None, description="Search in notes, special instructions")
+    
+    class Config:
+        frozen = True
+        defer_build = True
 
 
 class OrderApproval(BaseModel):
@@ -148,6 +161,9 @@ class OrderApproval(BaseModel):
         if v and v < 1:
             raise ValueError('Approved quantity must be at least 1')
         return v
+    
+    class Config:
+        defer_build = True
 
 
 class OrderRejection(BaseModel):
@@ -158,6 +174,9 @@ class OrderRejection(BaseModel):
     notes: Optional[str] = Field(None, max_length=1000, description="Additional rejection notes")
     suggest_alternative: bool = Field(False, description="Whether to suggest alternative medication")
     alternative_medication_id: Optional[str] = Field(None, description="Alternative medication ID")
+    
+    class Config:
+        defer_build = True
 
 
 class OrderFulfillment(BaseModel):
@@ -180,6 +199,9 @@ class OrderFulfillment(BaseModel):
         if v and v < date.today():
             raise ValueError('Expiry date cannot be in the past')
         return v
+    
+    class Config:
+        defer_build = True
 
 
 class OrderModification(BaseModel):
@@ -199,6 +221,9 @@ class OrderModification(BaseModel):
         if v and v < datetime.now():
             raise ValueError('New needed by date cannot be in the past')
         return v
+    
+    class Config:
+        defer_build = True
 
 
 class OrderSummary(BaseModel):
@@ -217,8 +242,12 @@ class OrderSummary(BaseModel):
     orders_this_month: int
     average_fulfillment_time: Optional[float] = None  # in hours
     total_value: Optional[Decimal] = None
-    top_medications: List[dict] = Field(default=[], description="Most ordered medications")
-    top_departments: List[dict] = Field(default=[], description="Top ordering departments")
+    top_medications: List[dict] = Field(default_factory=list, description="Most ordered medications")
+    top_departments: List[dict] = Field(default_factory=list, description="Top ordering departments")
+    
+    class Config:
+        frozen = True
+        defer_build = True
 
 
 class OrderBatch(BaseModel):
@@ -229,6 +258,9 @@ class OrderBatch(BaseModel):
     notes: Optional[str] = Field(None, max_length=1000, description="Batch order notes")
     priority: OrderUrgency = Field(OrderUrgency.NORMAL, description="Overall batch priority")
     needed_by: Optional[datetime] = Field(None, description="When batch is needed by")
+    
+    class Config:
+        defer_build = True
 
 
 class OrderTracking(BaseModel):
@@ -240,6 +272,9 @@ class OrderTracking(BaseModel):
     notes: Optional[str] = Field(None, max_length=500, description="Status update notes")
     location: Optional[str] = Field(None, max_length=200, description="Current location of order")
     estimated_completion: Optional[datetime] = Field(None, description="Estimated completion time")
+    
+    class Config:
+        defer_build = True
 
 
 class OrderAnalytics(BaseModel):
@@ -250,12 +285,15 @@ class OrderAnalytics(BaseModel):
     medication_id: Optional[str] = Field(None, description="Filter by medication")
     urgency_filter: Optional[OrderUrgency] = Field(None, description="Filter by urgency")
     
-    @validator('date_to')
-    def validate_date_range(cls, v, values):
+    @model_validator(mode='after')
+    def validate_date_range(self) -> 'OrderAnalytics':
         """Validate date range"""
-        if 'date_from' in values and v <= values['date_from']:
+        if self.date_to <= self.date_from:
             raise ValueError('End date must be after start date')
-        return v
+        return self
+    
+    class Config:
+        defer_build = True
 
 
 class OrderAnalyticsResponse(BaseModel):
@@ -272,6 +310,10 @@ class OrderAnalyticsResponse(BaseModel):
     top_medications: List[dict]
     daily_order_trend: List[dict]
     fulfillment_time_trend: List[dict]
+    
+    class Config:
+        frozen = True
+        defer_build = True
 
 
 class OrderNotification(BaseModel):
@@ -284,6 +326,9 @@ class OrderNotification(BaseModel):
     is_sent: bool = Field(False, description="Whether notification has been sent")
     sent_at: Optional[datetime] = None
     preferred_channel: str = Field("email", pattern="^(email|sms|push|in_app)$", description="Preferred notification channel")
+    
+    class Config:
+        defer_build = True
 
 
 class OrderTemplate(BaseModel):
@@ -300,6 +345,9 @@ class OrderTemplate(BaseModel):
     is_active: bool = Field(True, description="Whether template is active")
     usage_count: int = Field(0, ge=0, description="How many times template has been used")
     last_used: Optional[datetime] = None
+    
+    class Config:
+        defer_build = True
 
 
 class OrderIntegration(BaseModel):
@@ -314,3 +362,14 @@ class OrderIntegration(BaseModel):
     error_message: Optional[str] = Field(None, max_length=1000, description="Error message if sync failed")
     retry_count: int = Field(0, ge=0, description="Number of retry attempts")
     auto_sync: bool = Field(True, description="Whether to auto-sync changes")
+    
+    class Config:
+        defer_build = True
+
+
+# Build validators for the per-request models up front; the rest are
+# deferred until first use to keep import time down
+OrderCreate.model_rebuild()
+OrderResponse.model_rebuild()
+OrderBatch.model_rebuild()
+OrderSearch.model_rebuild()
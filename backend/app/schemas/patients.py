@@ -12,12 +12,12 @@ class PatientCreate(BaseModel):
     user_id: str = Field(..., description="Associated user ID")
     date_of_birth: Optional[date] = Field(None, description="Patient date of birth")
     blood_type: Optional[str] = Field(None, pattern="^(A|B|AB|O)[+-]$", description="Blood type (A+, A-, B+, B-, AB+, AB-, O+, O-)")
-    allergies: Optional[List[str]] = Field(default=[], description="List of allergies")
+    allergies: Optional[List[str]] = Field(default_factory=list, description="List of allergies")
     emergency_contact: Optional[str] = Field(None, max_length=100, description="Emergency contact name")
     emergency_phone: Optional[str] = Field(None, max_length=20, description="Emergency contact phone")
-    medical_history: Optional[List[str]] = Field(default=[], description="Medical history notes")
-    current_medications: Optional[List[str]] = Field(default=[], description="Current medications")
-    chronic_conditions: Optional[List[str]] = Field(default=[], description="Chronic conditions")
+    medical_history: Optional[List[str]] = Field(default_factory=list, description="Medical history notes")
+    current_medications: Optional[List[str]] = Field(default_factory=list, description="Current medications")
+    chronic_conditions: Optional[List[str]] = Field(default_factory=list, description="Chronic conditions")
     
     @validator('emergency_phone')
     def validate_phone(cls, v):
@@ -25,6 +25,9 @@ class PatientCreate(BaseModel):
         if v and not v.replace('-', '').replace(' ', '').replace('+', '').isdigit():
             raise ValueError('Phone number must contain only digits, spaces, hyphens, and plus sign')
         return v
+    
+    class Config:
+        defer_build = True
 
 
 class PatientUpdate(BaseModel):
@@ -44,6 +47,9 @@ class PatientUpdate(BaseModel):
         if v and not v.replace('-', '').replace(' ', '').replace('+', '').isdigit():
             raise ValueError('Phone number must contain only digits, spaces, hyphens, and plus sign')
         return v
+    
+    class Config:
+        defer_build = True
 
 
 class PatientResponse(BaseModel):
@@ -65,6 +71,8 @@ class PatientResponse(BaseModel):
     
     class Config:
         from_attributes = True
+        frozen = True
+        defer_build = True
 
 
 class PatientProfile(BaseModel):
@@ -89,6 +97,8 @@ class PatientProfile(BaseModel):
     
     class Config:
         from_attributes = True
+        frozen = True
+        defer_build = True
 
 
 class PatientSearch(BaseModel):
@@ -100,6 +110,10 @@ class PatientSearch(BaseModel):
     age_min: Optional[int] = Field(None, ge=0, le=150, description="Minimum age")
     age_max: Optional[int] = Field(None, ge=0, le=150, description="Maximum age")
     chronic_condition: Optional[str] = Field(None, description="Filter by chronic condition")
+    
+    class Config:
+        frozen = True
+        defer_build = True
 
 
 class PatientMedicalRecord(BaseModel):
@@ -112,7 +126,10 @@ class PatientMedicalRecord(BaseModel):
     notes: Optional[str] = None
     recorded_by: str = Field(..., description="Healthcare provider ID")
     recorded_at: datetime = Field(default_factory=datetime.utcnow)
-    attachments: Optional[List[str]] = Field(default=[], description="File attachments")
+    attachments: Optional[List[str]] = Field(default_factory=list, description="File attachments")
+    
+    class Config:
+        defer_build = True
 
 
 class PatientVitalSigns(BaseModel):
@@ -129,6 +146,9 @@ class PatientVitalSigns(BaseModel):
     recorded_by: str = Field(..., description="Healthcare provider ID")
     recorded_at: datetime = Field(default_factory=datetime.utcnow)
     notes: Optional[str] = None
+    
+    class Config:
+        defer_build = True
 
 
 class PatientAllergy(BaseModel):
@@ -141,6 +161,9 @@ class PatientAllergy(BaseModel):
     diagnosed_by: Optional[str] = Field(None, description="Healthcare provider who diagnosed")
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Config:
+        defer_build = True
 
 
 class PatientMedication(BaseModel):
@@ -154,9 +177,12 @@ class PatientMedication(BaseModel):
     end_date: Optional[date] = Field(None, description="When medication was stopped")
     prescribed_by: str = Field(..., description="Prescribing healthcare provider")
     reason: Optional[str] = Field(None, description="Reason for medication")
-    side_effects: Optional[List[str]] = Field(default=[], description="Known side effects")
+    side_effects: Optional[List[str]] = Field(default_factory=list, description="Known side effects")
     is_active: bool = Field(True, description="Whether medication is currently active")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Config:
+        defer_build = True
 
 
 class PatientVisit(BaseModel):
@@ -173,6 +199,9 @@ class PatientVisit(BaseModel):
     notes: Optional[str] = Field(None, description="Additional notes")
     visit_date: datetime = Field(default_factory=datetime.utcnow)
     duration_minutes: Optional[int] = Field(None, ge=0, description="Visit duration in minutes")
+    
+    class Config:
+        defer_build = True
 
 
 class PatientSummary(BaseModel):
@@ -188,3 +217,15 @@ class PatientSummary(BaseModel):
     chronic_conditions: int = 0
     emergency_contact: Optional[str]
     emergency_phone: Optional[str]
+    
+    class Config:
+        frozen = True
+        defer_build = True
+
+
+# Build validators for the per-request models up front; the rest are
+# deferred until first use to keep import time down
+PatientCreate.model_rebuild()
+PatientUpdate.model_rebuild()
+PatientResponse.model_rebuild()
+PatientSearch.model_rebuild()
@@ -2,13 +2,40 @@
 Prescription management schemas
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, TypeAdapter, ValidationInfo, field_validator, model_validator
+from typing import Optional, List, Any, Annotated, Literal
 from datetime import datetime, date, timezone
 from enum import Enum
+from functools import partial
+import msgspec
 
+from .common import FastORMMixin
 
-class PrescriptionStatus(str, Enum):
+# Timezone-aware timestamp factory for default_factory fields
+_utc_now = partial(datetime.now, timezone.utc)
+
+# PrescriptionAdherence has a field named "date", which shadows the type in its class body
+_Date = date
+
+# Field constraints and allowed values shared across schemas
+DosageStr = Annotated[str, Field(min_length=1, max_length=100)]
+PregnancyCategory = Literal["A", "B", "C", "D", "X"]
+Schedule = Literal["I", "II", "III", "IV", "V"]
+InteractionSeverity = Literal["minor", "moderate", "major", "contraindicated"]
+
+
+class _CaseInsensitiveEnum(str, Enum):
+    """String enum that also accepts values in any case"""
+    
+    @classmethod
+    def _missing_(cls, value):
+        """Resolve e.g. 'ACTIVE' through the value map instead of failing"""
+        if isinstance(value, str):
+            return cls._value2member_map_.get(value.lower())
+        return None
+
+
+class PrescriptionStatus(_CaseInsensitiveEnum):
     """Prescription status enumeration"""
     ACTIVE = "active"
     COMPLETED = "completed"
@@ -17,7 +44,7 @@ class PrescriptionStatus(str, Enum):
     EXPIRED = "expired"
 
 
-class DosageForm(str, Enum):
+class DosageForm(_CaseInsensitiveEnum):
     """Dosage form enumeration"""
     TABLET = "tablet"
     CAPSULE = "capsule"
@@ -37,8 +64,8 @@ class PrescriptionCreate(BaseModel):
     patient_id: str = Field(..., description="Patient ID")
     medication_id: str = Field(..., description="Medication ID")
     prescribed_by: Optional[str] = Field(None, description="Prescribing healthcare provider ID")
-    dosage: str = Field(..., min_length=1, max_length=100, description="Dosage amount (e.g., 500mg, 10ml)")
-    frequency: str = Field(..., min_length=1, max_length=100, description="How often to take (e.g., twice daily, every 8 hours)")
+    dosage: DosageStr = Field(..., description="Dosage amount (e.g., 500mg, 10ml)")
+    frequency: DosageStr = Field(..., description="How often to take (e.g., twice daily, every 8 hours)")
     start_date: date = Field(..., description="When to start taking medication")
     end_date: Optional[date] = Field(None, description="When to stop taking medication")
     instructions: Optional[str] = Field(None, max_length=500, description="Special instructions")
@@ -50,32 +77,22 @@ class PrescriptionCreate(BaseModel):
     is_prn: bool = Field(False, description="Whether medication is taken as needed (PRN)")
     prn_indications: Optional[str] = Field(None, max_length=200, description="When to take PRN medication")
     
-    @validator('end_date')
-    def validate_end_date(cls, v, values):
-        """Validate end date is after start date"""
-        if v and 'start_date' in values and v <= values['start_date']:
+    @model_validator(mode='after')
+    def validate_prescription(self) -> 'PrescriptionCreate':
+        """Validate date range, refill count and PRN indications"""
+        if self.end_date and self.end_date <= self.start_date:
             raise ValueError('End date must be after start date')
-        return v
-    
-    @validator('refills_used')
-    def validate_refills_used(cls, v, values):
-        """Validate refills used doesn't exceed refills allowed"""
-        if 'refills_allowed' in values and v > values['refills_allowed']:
+        if self.refills_used > (self.refills_allowed or 0):
             raise ValueError('Refills used cannot exceed refills allowed')
-        return v
-    
-    @validator('prn_indications')
-    def validate_prn_indications(cls, v, values):
-        """Validate PRN indications for PRN medications"""
-        if values.get('is_prn') and not v:
+        if self.is_prn and not self.prn_indications:
             raise ValueError('PRN indications are required for PRN medications')
-        return v
+        return self
 
 
 class PrescriptionUpdate(BaseModel):
     """Prescription update schema"""
-    dosage: Optional[str] = Field(None, min_length=1, max_length=100)
-    frequency: Optional[str] = Field(None, min_length=1, max_length=100)
+    dosage: Optional[DosageStr] = None
+    frequency: Optional[DosageStr] = None
     end_date: Optional[date] = None
     instructions: Optional[str] = Field(None, max_length=500)
     status: Optional[PrescriptionStatus] = None
@@ -86,15 +103,17 @@ class PrescriptionUpdate(BaseModel):
     is_prn: Optional[bool] = None
     prn_indications: Optional[str] = Field(None, max_length=200)
     
-    @validator('end_date')
-    def validate_end_date(cls, v, values):
+    @field_validator('end_date')
+    @classmethod
+    def validate_end_date(cls, v, info: ValidationInfo):
         """Validate end date is after start date"""
-        if v and 'start_date' in values and v <= values['start_date']:
+        start_date = info.data.get('start_date')
+        if v and start_date and v <= start_date:
             raise ValueError('End date must be after start date')
         return v
 
 
-class PrescriptionResponse(BaseModel):
+class PrescriptionResponse(FastORMMixin, BaseModel):
     """Prescription response schema"""
     id: str
     patient_id: str
@@ -148,13 +167,13 @@ class MedicationCreate(BaseModel):
     strength: Optional[str] = Field(None, max_length=50, description="Strength (e.g., 500mg)")
     ndc_code: Optional[str] = Field(None, max_length=20, description="National Drug Code")
     generic_name: Optional[str] = Field(None, max_length=200, description="Generic name")
-    brand_names: Optional[List[str]] = Field(default=[], description="Brand names")
-    contraindications: Optional[List[str]] = Field(default=[], description="Contraindications")
-    side_effects: Optional[List[str]] = Field(default=[], description="Common side effects")
-    drug_interactions: Optional[List[str]] = Field(default=[], description="Known drug interactions")
-    pregnancy_category: Optional[str] = Field(None, pattern="^[ABCDX]$", description="Pregnancy category")
+    brand_names: Optional[List[str]] = Field(default_factory=list, description="Brand names")
+    contraindications: Optional[List[str]] = Field(default_factory=list, description="Contraindications")
+    side_effects: Optional[List[str]] = Field(default_factory=list, description="Common side effects")
+    drug_interactions: Optional[List[str]] = Field(default_factory=list, description="Known drug interactions")
+    pregnancy_category: Optional[PregnancyCategory] = Field(None, description="Pregnancy category")
     controlled_substance: bool = Field(False, description="Whether it's a controlled substance")
-    schedule: Optional[str] = Field(None, pattern="^[IIIIIV]$", description="Controlled substance schedule")
+    schedule: Optional[Schedule] = Field(None, description="Controlled substance schedule")
     storage_requirements: Optional[str] = Field(None, max_length=200, description="Storage requirements")
     is_active: bool = Field(True, description="Whether medication is active")
 
@@ -172,14 +191,14 @@ class MedicationUpdate(BaseModel):
     contraindications: Optional[List[str]] = None
     side_effects: Optional[List[str]] = None
     drug_interactions: Optional[List[str]] = None
-    pregnancy_category: Optional[str] = Field(None, pattern="^[ABCDX]$")
+    pregnancy_category: Optional[PregnancyCategory] = None
     controlled_substance: Optional[bool] = None
-    schedule: Optional[str] = Field(None, pattern="^[IIIIIV]$")
+    schedule: Optional[Schedule] = None
     storage_requirements: Optional[str] = Field(None, max_length=200)
     is_active: Optional[bool] = None
 
 
-class MedicationResponse(BaseModel):
+class MedicationResponse(FastORMMixin, BaseModel):
     """Medication response schema"""
     id: str
     name: str
@@ -208,7 +227,7 @@ class PrescriptionRefill(BaseModel):
     """Prescription refill schema"""
     prescription_id: str
     refill_requested_by: str = Field(..., description="Who requested the refill")
-    refill_requested_at: datetime = Field(default_factory=datetime.utcnow)
+    refill_requested_at: datetime = Field(default_factory=_utc_now)
     pharmacy_id: Optional[str] = Field(None, description="Pharmacy processing the refill")
     notes: Optional[str] = Field(None, max_length=500, description="Refill notes")
     is_approved: Optional[bool] = None
@@ -226,24 +245,57 @@ class PrescriptionInteraction(BaseModel):
     medication_id: str
     interacting_medication_id: str
     interaction_type: str = Field(..., description="Type of interaction")
-    severity: str = Field(..., pattern="^(minor|moderate|major|contraindicated)$", description="Interaction severity")
+    severity: InteractionSeverity = Field(..., description="Interaction severity")
     description: str = Field(..., description="Interaction description")
     recommendation: Optional[str] = Field(None, description="Recommendation for managing interaction")
-    detected_at: datetime = Field(default_factory=datetime.utcnow)
+    detected_at: datetime = Field(default_factory=_utc_now)
 
 
 class PrescriptionAdherence(BaseModel):
     """Prescription adherence tracking schema"""
     prescription_id: str
     patient_id: str
-    date: date = Field(..., description="Date of adherence record")
+    date: _Date = Field(..., description="Date of adherence record")
     doses_scheduled: int = Field(..., ge=0, description="Number of doses scheduled for the day")
     doses_taken: int = Field(..., ge=0, description="Number of doses actually taken")
     adherence_percentage: float = Field(..., ge=0, le=100, description="Adherence percentage")
     notes: Optional[str] = Field(None, max_length=500, description="Notes about adherence")
     recorded_by: Optional[str] = None  # Could be patient or caregiver
-    # NEW, MODERN FIX
-    recorded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    recorded_at: datetime = Field(default_factory=_utc_now)
+
+
+class PrescriptionAdherenceMsg(msgspec.Struct, frozen=True, gc=False):
+    """Adherence record for bulk ingestion, decoded and validated by msgspec.
+    
+    Mirrors PrescriptionAdherence, which stays the documented request schema.
+    """
+    prescription_id: str
+    patient_id: str
+    date: _Date
+    doses_scheduled: Annotated[int, msgspec.Meta(ge=0)]
+    doses_taken: Annotated[int, msgspec.Meta(ge=0)]
+    adherence_percentage: Annotated[float, msgspec.Meta(ge=0, le=100)]
+    notes: Optional[Annotated[str, msgspec.Meta(max_length=500)]] = None
+    recorded_by: Optional[str] = None
+    recorded_at: datetime = msgspec.field(default_factory=_utc_now)
+
+
+_adherence_batch_decoder = msgspec.json.Decoder(List[PrescriptionAdherenceMsg])
+
+
+def decode_adherence_batch(body: bytes) -> List[PrescriptionAdherenceMsg]:
+    """Decode a raw JSON array of adherence records; raises msgspec.ValidationError on bad input"""
+    return _adherence_batch_decoder.decode(body)
+
+
+class CommonMedication(BaseModel):
+    """Medication prescription count for the dashboard summary"""
+    medication_id: str
+    name: str
+    count: int
+    
+    class Config:
+        extra = "ignore"
 
 
 class PrescriptionSummary(BaseModel):
@@ -254,7 +306,7 @@ class PrescriptionSummary(BaseModel):
     prescriptions_expiring_this_week: int
     refills_needed: int
     adherence_rate: Optional[float] = None
-    common_medications: List[dict] = Field(default=[], description="Most prescribed medications")
+    common_medications: List[CommonMedication] = Field(default_factory=list, description="Most prescribed medications")
     patients_with_active_prescriptions: int
     controlled_substance_prescriptions: int
 
@@ -279,10 +331,46 @@ class DrugInteractionCheck(BaseModel):
     include_conditions: bool = Field(True, description="Include condition-based interactions")
 
 
+class SeveritySummary(BaseModel):
+    """Count of interactions by severity"""
+    minor: int = 0
+    moderate: int = 0
+    major: int = 0
+    contraindicated: int = 0
+    
+    class Config:
+        extra = "forbid"
+
+
 class DrugInteractionResult(BaseModel):
     """Drug interaction check result schema"""
     has_interactions: bool
     interactions: List[PrescriptionInteraction]
-    severity_summary: dict[str, int] = Field(default={}, description="Count of interactions by severity")
-    recommendations: List[str] = Field(default=[], description="General recommendations")
-    checked_at: datetime = Field(default_factory=datetime.utcnow)
+    severity_summary: SeveritySummary = Field(default_factory=SeveritySummary, description="Count of interactions by severity")
+    recommendations: List[str] = Field(default_factory=list, description="General recommendations")
+    checked_at: datetime = Field(default_factory=_utc_now)
+
+
+# List endpoints validate and serialize whole result sets in one pydantic-core call
+_PRESCRIPTION_LIST = TypeAdapter(List[PrescriptionResponse])
+_MEDICATION_LIST = TypeAdapter(List[MedicationResponse])
+
+
+def prescriptions_from_rows(rows: List[Any]) -> List[PrescriptionResponse]:
+    """Validate database rows (dicts or ORM objects) as prescription responses"""
+    return _PRESCRIPTION_LIST.validate_python(rows, from_attributes=True)
+
+
+def medications_from_rows(rows: List[Any]) -> List[MedicationResponse]:
+    """Validate database rows (dicts or ORM objects) as medication responses"""
+    return _MEDICATION_LIST.validate_python(rows, from_attributes=True)
+
+
+def dump_prescriptions_json(items: List[PrescriptionResponse]) -> bytes:
+    """Serialize a list of prescription responses to JSON bytes"""
+    return _PRESCRIPTION_LIST.dump_json(items)
+
+
+def dump_medications_json(items: List[MedicationResponse]) -> bytes:
+    """Serialize a list of medication responses to JSON bytes"""
+    return _MEDICATION_LIST.dump_json(items)
@@ -2,10 +2,7 @@
 Utility functions and classes for Health Ecosystem Hub Backend
 """
 
-from .exceptions import *
-from .websocket import *
-from .validators import *
-from .helpers import *
+import importlib
 
 __all__ = [
     "HealthHubException",
@@ -17,3 +14,30 @@ __all__ = [
     "format_datetime",
     "calculate_age"
 ]
+
+# Submodules are imported on first attribute access (PEP 562) so that touching
+# one utility does not pull in FastAPI, websockets, etc. for all of them.
+_LAZY = {
+    "HealthHubException": "exceptions",
+    "setup_exception_handlers": "exceptions",
+    "websocket_manager": "websocket",
+    "validate_email": "validators",
+    "validate_phone": "validators",
+    "generate_id": "helpers",
+    "format_datetime": "helpers",
+    "calculate_age": "helpers",
+}
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,29 +3,62 @@ Custom exceptions for Health Ecosystem Hub Backend
 """
 
 from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
+from contextvars import ContextVar
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from sqlalchemy.exc import IntegrityError, NoResultFound, OperationalError, ProgrammingError
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Every error body starts the same way; only the dynamic fields are encoded per error
+_ERR_PREFIX = b'{"success":false,"timestamp":'
+
+# Wall-clock time the current request started, stamped once by the app middleware
+_request_ts: ContextVar[Optional[float]] = ContextVar("request_ts", default=None)
+
+
+def set_request_timestamp(timestamp: float) -> None:
+    """Record the start time of the current request"""
+    _request_ts.set(timestamp)
+
+
+def get_request_timestamp() -> float:
+    """Get the current request's start time, or now outside a request"""
+    timestamp = _request_ts.get()
+    return time.time() if timestamp is None else timestamp
+
 
 class HealthHubException(Exception):
     """Base exception for Health Hub application"""
     
+    # Fixed per subclass; only set on the instance when explicitly overridden
+    error_code: str = "UNKNOWN_ERROR"
+    status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
+    # error_code already JSON-encoded for error responses; kept in step with error_code
+    _error_code_json: bytes = orjson.dumps(error_code)
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._error_code_json = orjson.dumps(cls.error_code)
+    
     def __init__(
         self,
         message: str,
-        error_code: str = "UNKNOWN_ERROR",
-        status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+        error_code: Optional[str] = None,
+        status_code: Optional[int] = None,
         details: Dict[str, Any] = None
     ):
         super().__init__(message)
         self.message = message
-        self.error_code = error_code
-        self.status_code = status_code
         self.details = details or {}
+        if error_code is not None:
+            self.error_code = error_code
+            self._error_code_json = orjson.dumps(error_code)
+        if status_code is not None:
+            self.status_code = status_code
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert exception to dictionary"""
@@ -34,128 +67,120 @@ class HealthHubException(Exception):
             "message": self.message,
             "error_code": self.error_code,
             "details": self.details,
-            "timestamp": time.time()
+            "timestamp": get_request_timestamp()
         }
 
 
 class AuthenticationError(HealthHubException):
     """Authentication related errors"""
     
+    error_code = "AUTH_ERROR"
+    status_code = status.HTTP_401_UNAUTHORIZED
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="AUTH_ERROR",
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            details=details
-        )
+        super().__init__(message, details=details)
 
 
 class AuthorizationError(HealthHubException):
     """Authorization related errors"""
     
+    error_code = "AUTHORIZATION_ERROR"
+    status_code = status.HTTP_403_FORBIDDEN
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="AUTHORIZATION_ERROR",
-            status_code=status.HTTP_403_FORBIDDEN,
-            details=details
-        )
+        super().__init__(message, details=details)
 
 
 class ValidationError(HealthHubException):
     """Validation related errors"""
     
+    error_code = "VALIDATION_ERROR"
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="VALIDATION_ERROR",
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            details=details
-        )
+        super().__init__(message, details=details)
 
 
 class NotFoundError(HealthHubException):
     """Resource not found errors"""
     
+    error_code = "NOT_FOUND"
+    status_code = status.HTTP_404_NOT_FOUND
+    
     def __init__(self, message: str, resource_type: str = None, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="NOT_FOUND",
-            status_code=status.HTTP_404_NOT_FOUND,
-            details={**(details or {}), "resource_type": resource_type}
-        )
+        super().__init__(message, details={**(details or {}), "resource_type": resource_type})
 
 
 class ConflictError(HealthHubException):
     """Conflict errors"""
     
+    error_code = "CONFLICT"
+    status_code = status.HTTP_409_CONFLICT
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="CONFLICT",
-            status_code=status.HTTP_409_CONFLICT,
-            details=details
-        )
+        super().__init__(message, details=details)
 
 
 class BusinessLogicError(HealthHubException):
     """Business logic errors"""
     
+    error_code = "BUSINESS_LOGIC_ERROR"
+    status_code = status.HTTP_400_BAD_REQUEST
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="BUSINESS_LOGIC_ERROR",
-            status_code=status.HTTP_400_BAD_REQUEST,
-            details=details
-        )
+        super().__init__(message, details=details)
 
 
 class DatabaseError(HealthHubException):
     """Database related errors"""
     
+    error_code = "DATABASE_ERROR"
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="DATABASE_ERROR",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            details=details
-        )
+        super().__init__(message, details=details)
 
 
 class ExternalServiceError(HealthHubException):
     """External service errors"""
     
+    error_code = "EXTERNAL_SERVICE_ERROR"
+    status_code = status.HTTP_502_BAD_GATEWAY
+    
     def __init__(self, message: str, service_name: str = None, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="EXTERNAL_SERVICE_ERROR",
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            details={**(details or {}), "service_name": service_name}
-        )
+        super().__init__(message, details={**(details or {}), "service_name": service_name})
 
 
 class RateLimitError(HealthHubException):
     """Rate limiting errors"""
     
+    error_code = "RATE_LIMIT_EXCEEDED"
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    
     def __init__(self, message: str, retry_after: int = None, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="RATE_LIMIT_EXCEEDED",
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            details={**(details or {}), "retry_after": retry_after}
-        )
+        super().__init__(message, details={**(details or {}), "retry_after": retry_after})
 
 
 class ConfigurationError(HealthHubException):
     """Configuration related errors"""
     
+    error_code = "CONFIGURATION_ERROR"
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    
     def __init__(self, message: str, details: Dict[str, Any] = None):
-        super().__init__(
-            message=message,
-            error_code="CONFIGURATION_ERROR",
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            details=details
-        )
+        super().__init__(message, details=details)
+
+
+def _error_response(status_code: int, message: str, error_code: bytes, details: Dict[str, Any]) -> Response:
+    """Build a JSON error response; error_code is the already JSON-encoded code"""
+    body = (
+        _ERR_PREFIX + orjson.dumps(get_request_timestamp())
+        + b',"message":' + orjson.dumps(message)
+        + b',"error_code":' + error_code
+        + b',"details":' + orjson.dumps(details, default=str, option=orjson.OPT_NON_STR_KEYS)
+        + b'}'
+    )
+    return Response(content=body, status_code=status_code, media_type="application/json")
 
 
 def setup_exception_handlers(app):
@@ -164,75 +189,73 @@ def setup_exception_handlers(app):
     @app.exception_handler(HealthHubException)
     async def health_hub_exception_handler(request: Request, exc: HealthHubException):
         """Handle Health Hub exceptions"""
-        logger.error(f"HealthHub Exception: {exc.error_code} - {exc.message}")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=exc.to_dict()
-        )
+        logger.error("HealthHub Exception: %s - %s", exc.error_code, exc.message)
+        return _error_response(exc.status_code, exc.message, exc._error_code_json, exc.details)
     
     @app.exception_handler(ValueError)
     async def value_error_handler(request: Request, exc: ValueError):
         """Handle ValueError exceptions"""
-        logger.error(f"ValueError: {str(exc)}")
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "success": False,
-                "message": "Invalid input value",
-                "error_code": "INVALID_VALUE",
-                "details": {"error": str(exc)},
-                "timestamp": time.time()
-            }
+        logger.error("ValueError: %s", exc)
+        return _error_response(
+            status.HTTP_400_BAD_REQUEST,
+            "Invalid input value",
+            b'"INVALID_VALUE"',
+            {"error": str(exc)}
         )
     
     @app.exception_handler(KeyError)
     async def key_error_handler(request: Request, exc: KeyError):
         """Handle KeyError exceptions"""
-        logger.error(f"KeyError: {str(exc)}")
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "success": False,
-                "message": "Missing required field",
-                "error_code": "MISSING_FIELD",
-                "details": {"missing_key": str(exc)},
-                "timestamp": time.time()
-            }
+        logger.error("KeyError: %s", exc)
+        return _error_response(
+            status.HTTP_400_BAD_REQUEST,
+            "Missing required field",
+            b'"MISSING_FIELD"',
+            {"missing_key": str(exc)}
         )
     
     @app.exception_handler(TypeError)
     async def type_error_handler(request: Request, exc: TypeError):
         """Handle TypeError exceptions"""
-        logger.error(f"TypeError: {str(exc)}")
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "success": False,
-                "message": "Invalid data type",
-                "error_code": "INVALID_TYPE",
-                "details": {"error": str(exc)},
-                "timestamp": time.time()
-            }
+        logger.error("TypeError: %s", exc)
+        return _error_response(
+            status.HTTP_400_BAD_REQUEST,
+            "Invalid data type",
+            b'"INVALID_TYPE"',
+            {"error": str(exc)}
         )
     
     @app.exception_handler(PermissionError)
     async def permission_error_handler(request: Request, exc: PermissionError):
         """Handle PermissionError exceptions"""
-        logger.error(f"PermissionError: {str(exc)}")
-        return JSONResponse(
-            status_code=status.HTTP_403_FORBIDDEN,
-            content={
-                "success": False,
-                "message": "Permission denied",
-                "error_code": "PERMISSION_DENIED",
-                "details": {"error": str(exc)},
-                "timestamp": time.time()
-            }
+        logger.error("PermissionError: %s", exc)
+        return _error_response(
+            status.HTTP_403_FORBIDDEN,
+            "Permission denied",
+            b'"PERMISSION_DENIED"',
+            {"error": str(exc)}
         )
 
 
+# Typed database errors and the exception/message they map to
+_DB_ERROR_MAP = {
+    IntegrityError: (ConflictError, "Duplicate record"),
+    NoResultFound: (NotFoundError, "Record not found"),
+    OperationalError: (DatabaseError, "Database connection error"),
+    ProgrammingError: (DatabaseError, "Database error"),
+}
+
+
 def handle_database_error(error: Exception, operation: str = "database operation") -> HealthHubException:
     """Convert database errors to HealthHubException"""
+    # Walk the MRO so driver-specific subclasses map like the SQLAlchemy class they extend
+    for error_class in type(error).__mro__:
+        mapped = _DB_ERROR_MAP.get(error_class)
+        if mapped:
+            exc_class, message = mapped
+            return exc_class(f"{message} during {operation}", details={"original_error": str(error)})
+    
+    # Fall back to inspecting the message for errors from other drivers/clients
     error_str = str(error).lower()
     
     if "connection" in error_str or "timeout" in error_str:
@@ -264,13 +287,16 @@ def handle_database_error(error: Exception, operation: str = "database operation
 
 def log_exception(exc: Exception, context: str = "application"):
     """Log exception with context"""
+    if not logger.isEnabledFor(logging.ERROR):
+        return
+    
     if isinstance(exc, HealthHubException):
         logger.error(
-            f"{context}: {exc.error_code} - {exc.message}",
+            "%s: %s - %s", context, exc.error_code, exc.message,
             extra={"details": exc.details}
         )
     else:
-        logger.error(f"{context}: {type(exc).__name__} - {str(exc)}", exc_info=True)
+        logger.error("%s: %s - %s", context, type(exc).__name__, exc, exc_info=True)
 
 
 def create_error_response(
@@ -285,5 +311,5 @@ def create_error_response(
         "message": message,
         "error_code": error_code,
         "details": details or {},
-        "timestamp": time.time()
+        "timestamp": get_request_timestamp()
     }
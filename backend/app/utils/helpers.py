@@ -4,12 +4,62 @@ Helper utilities for Health Ecosystem Hub Backend
 
 import uuid
 import hashlib
+import hmac
 import secrets
 import time
-from datetime import datetime, date
-from typing import Any, Dict, List, Optional
+from datetime import datetime, date, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import json
 import re
+import orjson
+
+
+_SPECIAL_CHAR_RE = re.compile(r'[^\w\s\-\.,]')
+_SAFE_FILENAME_RE = re.compile(r'[^\w\-.]')
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip address
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+_UUID_RE = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z')
+
+# scrypt cost parameters for password hashing (~16 MiB of memory per hash)
+_SCRYPT_N = 2 ** 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+# str.translate tables deleting the ASCII characters the regexes above strip;
+# non-ASCII input still goes through the regex so Unicode word characters are kept
+_CLEAN_TRANS = {i: None for i in range(128) if not (chr(i).isalnum() or chr(i).isspace() or chr(i) in '_-.,')}
+_FILENAME_TRANS = {i: None for i in range(128) if not (chr(i).isalnum() or chr(i) in '_-.')}
+_NON_DIGIT_TRANS = {i: None for i in range(128) if not chr(i).isdigit()}
+
+_MIME_TYPES = {
+    'txt': 'text/plain',
+    'html': 'text/html',
+    'css': 'text/css',
+    'js': 'application/javascript',
+    'json': 'application/json',
+    'xml': 'application/xml',
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'xls': 'application/vnd.ms-excel',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'zip': 'application/zip',
+    'rar': 'application/x-rar-compressed'
+}
+
+_SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+_LOWER_OR_DIGIT = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
 
 
 def generate_id() -> str:
@@ -22,9 +72,25 @@ def generate_short_id(length: int = 8) -> str:
     return secrets.token_hex(length // 2)[:length]
 
 
+def _scrypt(password: str, salt: bytes) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P)
+
+
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password using scrypt with a random salt, returned as "salt$hash" in hex"""
+    salt = secrets.token_bytes(16)
+    return f"{salt.hex()}${_scrypt(password, salt).hex()}"
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a hash produced by hash_password"""
+    try:
+        salt_hex, key_hex = password_hash.split('$', 1)
+        salt = bytes.fromhex(salt_hex)
+        key = bytes.fromhex(key_hex)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_scrypt(password, salt), key)
 
 
 def generate_random_token(length: int = 32) -> str:
@@ -34,27 +100,44 @@ def generate_random_token(length: int = 32) -> str:
 
 def format_datetime(dt: datetime, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
     """Format datetime to string"""
+    # Plain dates and years before 1000 (unpadded by strftime) take the strftime path
+    if format_str == "%Y-%m-%d %H:%M:%S" and isinstance(dt, datetime) and dt.year >= 1000:
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
     return dt.strftime(format_str)
 
 
 def parse_datetime(date_string: str, format_str: str = "%Y-%m-%d %H:%M:%S") -> Optional[datetime]:
     """Parse string to datetime"""
+    # ISO 8601 strings (including the default format) parse much faster via fromisoformat
+    if format_str == "%Y-%m-%d %H:%M:%S":
+        try:
+            return datetime.fromisoformat(date_string)
+        except ValueError:
+            pass
     try:
         return datetime.strptime(date_string, format_str)
     except ValueError:
         return None
 
 
+# [expires_at, date] for get_today; expires at the next local midnight
+_today_cache: List[Any] = [0.0, None]
+
+
+def get_today() -> date:
+    """Get today's date, recomputed only when the local date changes"""
+    if time.time() >= _today_cache[0]:
+        today = date.today()
+        next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        _today_cache[:] = [next_midnight.timestamp(), today]
+    return _today_cache[1]
+
+
 def calculate_age(birth_date: date) -> int:
     """Calculate age from birth date"""
-    today = date.today()
-    age = today.year - birth_date.year
-    
-    # Adjust age if birthday hasn't occurred this year yet
-    if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
-        age -= 1
-    
-    return age
+    today = get_today()
+    # Subtract one if the birthday hasn't occurred this year yet
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
 
 def format_currency(amount: float, currency: str = "USD") -> str:
@@ -65,7 +148,10 @@ def format_currency(amount: float, currency: str = "USD") -> str:
 def format_phone_number(phone: str) -> str:
     """Format phone number consistently"""
     # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
+    if phone.isascii():
+        digits = phone.translate(_NON_DIGIT_TRANS)
+    else:
+        digits = ''.join(ch for ch in phone if ch.isdecimal())
     
     # Format as (XXX) XXX-XXXX if 10 digits
     if len(digits) == 10:
@@ -92,23 +178,37 @@ def clean_string(text: str) -> str:
     text = ' '.join(text.split())
     
     # Remove special characters except basic punctuation
-    text = re.sub(r'[^\w\s\-\.,]', '', text)
+    if text.isascii():
+        text = text.translate(_CLEAN_TRANS)
+    else:
+        text = _SPECIAL_CHAR_RE.sub('', text)
     
     return text.strip()
 
 
-def serialize_data(data: Any) -> str:
-    """Serialize data to JSON string"""
+def serialize_data_bytes(data: Any) -> bytes:
+    """Serialize data to JSON bytes"""
+    try:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        pass
+    
+    # orjson rejects some inputs the stdlib encoder accepts (e.g. integers over 64 bits)
     try:
-        return json.dumps(data, default=str, ensure_ascii=False)
+        return json.dumps(data, default=str, ensure_ascii=False).encode('utf-8')
     except (TypeError, ValueError) as e:
         raise ValueError(f"Cannot serialize data: {str(e)}")
 
 
+def serialize_data(data: Any) -> str:
+    """Serialize data to JSON string"""
+    return serialize_data_bytes(data).decode('utf-8')
+
+
 def deserialize_data(json_string: str) -> Any:
     """Deserialize JSON string to data"""
     try:
-        return json.loads(json_string)
+        return orjson.loads(json_string)
     except (TypeError, ValueError) as e:
         raise ValueError(f"Cannot deserialize JSON: {str(e)}")
 
@@ -131,16 +231,19 @@ def safe_get_nested(data: Dict[str, Any], keys: List[str], default: Any = None)
 
 def merge_dicts(*dicts: Dict[str, Any]) -> Dict[str, Any]:
     """Merge multiple dictionaries"""
+    if len(dicts) == 2 and isinstance(dicts[0], dict) and isinstance(dicts[1], dict):
+        return {**dicts[0], **dicts[1]}
+    
     result = {}
     for d in dicts:
         if isinstance(d, dict):
-            result.update(d)
+            result |= d
     return result
 
 
 def filter_dict(data: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
     """Filter dictionary to only include specified keys"""
-    return {k: v for k, v in data.items() if k in keys}
+    return {k: data[k] for k in keys if k in data}
 
 
 def remove_none_values(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -150,39 +253,48 @@ def remove_none_values(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def flatten_dict(data: Dict[str, Any], separator: str = "_") -> Dict[str, Any]:
     """Flatten nested dictionary"""
-    def _flatten(obj, parent_key=''):
-        items = {}
-        for k, v in obj.items():
+    result = {}
+    # Stack of (key prefix, remaining items) so keys keep depth-first order
+    stack = [('', iter(data.items()))]
+    while stack:
+        parent_key, items = stack[-1]
+        for k, v in items:
             new_key = f"{parent_key}{separator}{k}" if parent_key else k
             if isinstance(v, dict):
-                items.update(_flatten(v, new_key))
-            else:
-                items[new_key] = v
-        return items
+                stack.append((new_key, iter(v.items())))
+                break
+            result[new_key] = v
+        else:
+            stack.pop()
     
-    return _flatten(data)
+    return result
 
 
 def chunk_list(items: List[Any], chunk_size: int) -> List[List[Any]]:
     """Split list into chunks"""
-    chunks = []
-    for i in range(0, len(items), chunk_size):
-        chunks.append(items[i:i + chunk_size])
-    return chunks
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def chunk_iter(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Lazily split any iterable into chunks"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
 
 
 def paginate_list(items: List[Any], page: int, page_size: int) -> Dict[str, Any]:
     """Paginate list"""
+    total = len(items)
     start = (page - 1) * page_size
     end = start + page_size
     
     return {
-        "items": items[start:end],
+        "items": items[start:end] if start < total else [],
         "page": page,
         "page_size": page_size,
-        "total": len(items),
-        "total_pages": (len(items) + page_size - 1) // page_size,
-        "has_next": end < len(items),
+        "total": total,
+        "total_pages": (total + page_size - 1) // page_size,
+        "has_next": end < total,
         "has_prev": page > 1
     }
 
@@ -204,9 +316,19 @@ def get_timestamp() -> int:
     return int(time.time())
 
 
-def get_iso_timestamp() -> str:
-    """Get current ISO timestamp"""
-    return datetime.utcnow().isoformat() + 'Z'
+# (suffix, resolution) -> [expires_at, timestamp] for get_iso_timestamp
+_iso_timestamp_cache: Dict[Tuple[str, float], List[Any]] = {}
+
+
+def get_iso_timestamp(suffix: str = 'Z', resolution: float = 0.01) -> str:
+    """Get current ISO timestamp, recomputed at most every `resolution` seconds"""
+    cached = _iso_timestamp_cache.get((suffix, resolution))
+    if cached is None:
+        cached = _iso_timestamp_cache[(suffix, resolution)] = [0.0, '']
+    now = time.time()
+    if now >= cached[0]:
+        cached[:] = [now + resolution, datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat() + suffix]
+    return cached[1]
 
 
 def days_between(start_date: date, end_date: date) -> int:
@@ -220,12 +342,8 @@ def add_days_to_date(start_date: date, days: int) -> date:
 
 
 def is_valid_uuid(uuid_string: str) -> bool:
-    """Check if string is valid UUID"""
-    try:
-        uuid.UUID(uuid_string)
-        return True
-    except ValueError:
-        return False
+    """Check if string is valid UUID in canonical 8-4-4-4-12 hex form"""
+    return isinstance(uuid_string, str) and _UUID_RE.match(uuid_string) is not None
 
 
 def mask_sensitive_data(data: str, mask_char: str = "*", visible_chars: int = 4) -> str:
@@ -233,7 +351,7 @@ def mask_sensitive_data(data: str, mask_char: str = "*", visible_chars: int = 4)
     if len(data) <= visible_chars * 2:
         return mask_char * len(data)
     
-    return data[:visible_chars] + mask_char * (len(data) - visible_chars * 2) + data[-visible_chars:]
+    return f"{data[:visible_chars]}{mask_char * (len(data) - visible_chars * 2)}{data[-visible_chars:]}"
 
 
 def generate_filename(prefix: str, extension: str = ".txt") -> str:
@@ -252,23 +370,17 @@ def extract_domain(email: str) -> str:
 
 def is_valid_url(url: str) -> bool:
     """Check if string is valid URL"""
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip address
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    return url_pattern.match(url) is not None
+    return _URL_RE.match(url) is not None
 
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
-    # Remove path separators
-    filename = filename.replace('/', '').replace('\\', '')
-    
-    # Remove special characters except letters, numbers, dots, hyphens, underscores
-    filename = re.sub(r'[^\w\-.]', '', filename)
+    # Remove path separators and special characters except letters, numbers,
+    # dots, hyphens, underscores
+    if filename.isascii():
+        filename = filename.translate(_FILENAME_TRANS)
+    else:
+        filename = _SAFE_FILENAME_RE.sub('', filename)
     
     # Remove leading/trailing dots and spaces
     filename = filename.strip(' .')
@@ -285,42 +397,20 @@ def format_file_size(size_bytes: int) -> str:
     if size_bytes == 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    size = float(size_bytes)
-    
-    while size >= 1024 and i < len(size_names) - 1:
-        size /= 1024
-        i += 1
+    # Each unit is 2**10 times the previous one, so the bit length gives the unit index;
+    # negative and fractional sizes (bit length 0) stay in bytes
+    i = min(max((int(size_bytes).bit_length() - 1) // 10, 0), len(_SIZE_NAMES) - 1) if size_bytes > 0 else 0
     
-    return f"{size:.1f} {size_names[i]}"
+    return f"{size_bytes / (1 << (i * 10)):.1f} {_SIZE_NAMES[i]}"
 
 
 def get_mime_type(filename: str) -> str:
     """Get MIME type from filename"""
-    extension = filename.lower().split('.')[-1] if '.' in filename else ''
-    
-    mime_types = {
-        'txt': 'text/plain',
-        'html': 'text/html',
-        'css': 'text/css',
-        'js': 'application/javascript',
-        'json': 'application/json',
-        'xml': 'application/xml',
-        'pdf': 'application/pdf',
-        'doc': 'application/msword',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'xls': 'application/vnd.ms-excel',
-        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        'png': 'image/png',
-        'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg',
-        'gif': 'image/gif',
-        'zip': 'application/zip',
-        'rar': 'application/x-rar-compressed'
-    }
+    _, dot, extension = filename.rpartition('.')
+    if not dot:
+        return 'application/octet-stream'
     
-    return mime_types.get(extension, 'application/octet-stream')
+    return _MIME_TYPES.get(extension.lower(), 'application/octet-stream')
 
 
 def create_response_dict(success: bool = True, message: str = "", data: Any = None, 
@@ -367,11 +457,18 @@ def deep_merge_dict(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, A
     """Deep merge two dictionaries"""
     result = dict1.copy()
     
-    for key, value in dict2.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = deep_merge_dict(result[key], value)
-        else:
-            result[key] = value
+    # Only nested dicts present on both sides are copied before merging into them;
+    # everything else from dict2 is assigned by reference
+    stack = [(result, dict2)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            existing = target.get(key)
+            if isinstance(existing, dict) and isinstance(value, dict):
+                existing = target[key] = existing.copy()
+                stack.append((existing, value))
+            else:
+                target[key] = value
     
     return result
 
@@ -405,14 +502,30 @@ def set_nested_value(data: Dict[str, Any], path: str, value: Any) -> None:
 
 def convert_to_snake_case(text: str) -> str:
     """Convert text to snake_case"""
-    # Insert underscore before capital letters
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', text)
-    # Insert underscore before capital letters that follow lowercase letters or numbers
-    s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-    # Replace spaces and hyphens with underscores
-    s3 = re.sub(r'[-\s]+', '_', s2)
-    # Convert to lowercase
-    return s3.lower()
+    result = []
+    last = len(text) - 1
+    prev = ''
+    in_separator = False
+    for i, ch in enumerate(text):
+        # Replace runs of spaces and hyphens with a single underscore
+        if ch == '-' or ch.isspace():
+            if not in_separator:
+                result.append('_')
+                in_separator = True
+            prev = ch
+            continue
+        in_separator = False
+        
+        # Insert underscore before a capital letter that starts a word (e.g. "Case" in
+        # "snakeCase" or "HTTPCase") or follows a lowercase letter or number
+        if 'A' <= ch <= 'Z' and i and (
+            prev in _LOWER_OR_DIGIT or (prev != '\n' and i < last and 'a' <= text[i + 1] <= 'z')
+        ):
+            result.append('_')
+        result.append(ch)
+        prev = ch
+    
+    return ''.join(result).lower()
 
 
 def convert_to_camel_case(text: str) -> str:
@@ -466,7 +579,7 @@ def format_list_response(items: List[Any], page: int, page_size: int, total: int
     end_index = min(start_index + page_size, total)
     
     return {
-        "items": items[start_index:end_index],
+        "items": items[start_index:end_index] if start_index < end_index else [],
         "pagination": {
             "page": page,
             "page_size": page_size,
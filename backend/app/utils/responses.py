@@ -0,0 +1,45 @@
+"""
+Fast JSON responses for Health Ecosystem Hub Backend
+"""
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from enum import Enum
+from typing import Any, List, Union
+from uuid import UUID
+import orjson
+
+
+def orjson_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+class FastORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
+
+
+def model_response(model: Union[BaseModel, List[BaseModel]], status_code: int = 200) -> FastORJSONResponse:
+    """Dump response models to JSON-safe data and wrap them in a FastORJSONResponse.
+    
+    Returning this from an endpoint skips FastAPI's response_model
+    validation and jsonable_encoder pass.
+    """
+    if isinstance(model, list):
+        content = [item.model_dump(mode="json") for item in model]
+    else:
+        content = model.model_dump(mode="json")
+    return FastORJSONResponse(content=content, status_code=status_code)
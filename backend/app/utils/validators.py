@@ -3,9 +3,50 @@ Validation utilities for Health Ecosystem Hub Backend
 """
 
 import re
+import string
 from typing import Optional, Any
 from datetime import datetime, date
 from app.utils.exceptions import ValidationError
+from app.utils.helpers import get_today, is_valid_uuid
+
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_CLEAN_RE = re.compile(r'[\s\-\(\)]')
+_PHONE_CLEAN_TRANS = {i: None for i in range(128) if chr(i).isspace() or chr(i) in '-()'}
+_WEAK_RE = re.compile(r'(123|password|qwerty|abc|admin|letmein|welcome|login)', re.IGNORECASE)
+_FREQUENCY_RE = re.compile(
+    r'daily|once daily|qd|bid|twice daily|tid|qid|every \d+ hours?|as needed|prn|weekly|monthly',
+    re.IGNORECASE
+)
+_NAME_RE = re.compile(r"^[a-zA-Z\s\-']+$")
+_LICENSE_RE = re.compile(r'^[a-zA-Z0-9\s\-]+$')
+_MED_NAME_RE = re.compile(r"^[a-zA-Z0-9\s\-]+$")
+_DOSAGE_RE = re.compile(r'^[0-9]+\s*(mg|g|ml|mcg|ug|tablet|capsule|pill|dose|tsp|tbsp)?$')
+_ADDRESS_RE = re.compile(r"^[a-zA-Z0-9\s\-\.,#]+$")
+_SANITIZE_RE = re.compile(r'[<>"\']')
+
+_BLOOD_TYPES = frozenset(('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-'))
+_BLOOD_TYPE_ERROR = "Invalid blood type. Must be one of: A+, A-, B+, B-, AB+, AB-, O+, O-"
+
+# Character classes required in a password, as bit flags indexed by byte value
+_PW_UPPER, _PW_LOWER, _PW_DIGIT, _PW_SPECIAL = 1, 2, 4, 8
+
+
+def _build_password_classes() -> bytes:
+    """Build the byte value -> character class flag table for password checks"""
+    table = bytearray(256)
+    for chars, flag in (
+        (string.ascii_uppercase, _PW_UPPER),
+        (string.ascii_lowercase, _PW_LOWER),
+        (string.digits, _PW_DIGIT),
+        ('!@#$%^&*()_+-=[]{};:"|,.<>/?', _PW_SPECIAL),
+    ):
+        for char in chars:
+            table[ord(char)] = flag
+    return bytes(table)
+
+
+_PW_CLASS = _build_password_classes()
 
 
 def validate_email(email: str) -> bool:
@@ -13,8 +54,7 @@ def validate_email(email: str) -> bool:
     if not email or not isinstance(email, str):
         return False
     
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(email_pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 
 def validate_phone(phone: str) -> bool:
@@ -23,7 +63,10 @@ def validate_phone(phone: str) -> bool:
         return False
     
     # Remove common phone number formatting characters
-    clean_phone = re.sub(r'[\s\-\(\)]', '', phone)
+    if phone.isascii():
+        clean_phone = phone.translate(_PHONE_CLEAN_TRANS)
+    else:
+        clean_phone = _PHONE_CLEAN_RE.sub('', phone)
     
     # Check if it's all digits and reasonable length
     return clean_phone.isdigit() and 7 <= len(clean_phone) <= 15
@@ -40,31 +83,31 @@ def validate_password(password: str) -> tuple[bool, Optional[str]]:
     if len(password) > 100:
         return False, "Password must be less than 100 characters long"
     
+    # Collect the character classes present in a single pass
+    classes = 0
+    for byte in password.encode('utf-8', 'ignore'):
+        classes |= _PW_CLASS[byte]
+    
     # Check for at least one uppercase letter
-    if not re.search(r'[A-Z]', password):
+    if not classes & _PW_UPPER:
         return False, "Password must contain at least one uppercase letter"
     
     # Check for at least one lowercase letter
-    if not re.search(r'[a-z]', password):
+    if not classes & _PW_LOWER:
         return False, "Password must contain at least one lowercase letter"
     
     # Check for at least one digit
-    if not re.search(r'\d', password):
+    if not classes & _PW_DIGIT:
         return False, "Password must contain at least one digit"
     
     # Check for at least one special character
-    if not re.search(r'[!@#$%^&*()_+\-=\[\]{};:"|,.<>/?]', password):
+    if not classes & _PW_SPECIAL:
         return False, "Password must contain at least one special character"
     
     # Check for common weak patterns
-    weak_patterns = [
-        r'123', r'password', r'qwerty', r'abc', r'admin',
-        r'letmein', r'welcome', r'login'
-    ]
-    
-    for pattern in weak_patterns:
-        if re.search(pattern, password.lower()):
-            return False, f"Password contains common weak pattern: {pattern}"
+    weak = _WEAK_RE.search(password)
+    if weak:
+        return False, f"Password contains common weak pattern: {weak.group(1).lower()}"
     
     return True, None
 
@@ -81,7 +124,7 @@ def validate_name(name: str, field_name: str = "Name") -> tuple[bool, Optional[s
         return False, f"{field_name} must be less than 100 characters long"
     
     # Check for valid characters (letters, spaces, hyphens, apostrophes)
-    if not re.match(r"^[a-zA-Z\s\-']+$", name):
+    if not _NAME_RE.match(name):
         return False, f"{field_name} can only contain letters, spaces, hyphens, and apostrophes"
     
     return True, None
@@ -92,7 +135,7 @@ def validate_date_of_birth(dob: date) -> tuple[bool, Optional[str]]:
     if not isinstance(dob, date):
         return False, "Invalid date format"
     
-    today = date.today()
+    today = get_today()
     min_date = today.replace(year=today.year - 120)  # 120 years ago
     
     if dob > today:
@@ -109,10 +152,8 @@ def validate_blood_type(blood_type: str) -> tuple[bool, Optional[str]]:
     if not blood_type:
         return True, None  # Optional field
     
-    valid_types = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
-    
-    if blood_type not in valid_types:
-        return False, f"Invalid blood type. Must be one of: {', '.join(valid_types)}"
+    if blood_type not in _BLOOD_TYPES:
+        return False, _BLOOD_TYPE_ERROR
     
     return True, None
 
@@ -129,7 +170,7 @@ def validate_medical_license(license_number: str) -> tuple[bool, Optional[str]]:
         return False, "License number must be less than 50 characters long"
     
     # Check for alphanumeric characters and common separators
-    if not re.match(r'^[a-zA-Z0-9\s\-]+$', license_number):
+    if not _LICENSE_RE.match(license_number):
         return False, "License number can only contain letters, numbers, spaces, and hyphens"
     
     return True, None
@@ -189,7 +230,7 @@ def validate_medication_name(name: str) -> tuple[bool, Optional[str]]:
         return False, "Medication name must be less than 200 characters long"
     
     # Check for valid characters (letters, numbers, spaces, hyphens)
-    if not re.match(r"^[a-zA-Z0-9\s\-]+$", name):
+    if not _MED_NAME_RE.match(name):
         return False, "Medication name can only contain letters, numbers, spaces, and hyphens"
     
     return True, None
@@ -209,7 +250,7 @@ def validate_dosage(dosage: str) -> tuple[bool, Optional[str]]:
         return False, "Dosage must be less than 100 characters long"
     
     # Basic dosage pattern (numbers, units, common abbreviations)
-    if not re.match(r'^[0-9]+\s*(mg|g|ml|mcg|ug|tablet|capsule|pill|dose|tsp|tbsp)?$', dosage.lower()):
+    if not _DOSAGE_RE.match(dosage.lower()):
         return False, "Dosage format is invalid. Example: 500mg, 1 tablet, 2 tsp"
     
     return True, None
@@ -229,15 +270,8 @@ def validate_frequency(frequency: str) -> tuple[bool, Optional[str]]:
         return False, "Frequency must be less than 100 characters long"
     
     # Common frequency patterns
-    valid_patterns = [
-        r'daily', r'once daily', r'qd', r'bid', r'twice daily', r'tid', r'qid',
-        r'every \d+ hours?', r'as needed', r'prn', r'weekly', r'monthly'
-    ]
-    
-    frequency_lower = frequency.lower()
-    for pattern in valid_patterns:
-        if re.search(pattern, frequency_lower):
-            return True, None
+    if _FREQUENCY_RE.search(frequency):
+        return True, None
     
     return False, "Invalid frequency format. Examples: twice daily, every 8 hours, as needed"
 
@@ -278,7 +312,7 @@ def validate_address(address: str) -> tuple[bool, Optional[str]]:
         return False, "Address must be less than 500 characters long"
     
     # Check for valid characters (letters, numbers, spaces, common punctuation)
-    if not re.match(r"^[a-zA-Z0-9\s\-\.,#]+$", address):
+    if not _ADDRESS_RE.match(address):
         return False, "Address contains invalid characters"
     
     return True, None
@@ -289,10 +323,7 @@ def validate_uuid(uuid_string: str) -> tuple[bool, Optional[str]]:
     if not uuid_string or not isinstance(uuid_string, str):
         return False, "UUID is required"
     
-    # UUID v4 pattern
-    uuid_pattern = r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
-    
-    if not re.match(uuid_pattern, uuid_string):
+    if not is_valid_uuid(uuid_string):
         return False, "Invalid UUID format"
     
     return True, None
@@ -301,7 +332,8 @@ def validate_uuid(uuid_string: str) -> tuple[bool, Optional[str]]:
 def validate_required_fields(data: dict, required_fields: list) -> tuple[bool, Optional[str]]:
     """Validate that all required fields are present"""
     for field in required_fields:
-        if field not in data or data[field] is None or str(data[field]).strip() == '':
+        value = data.get(field)
+        if value is None or (isinstance(value, str) and not value.strip()):
             return False, f"Required field '{field}' is missing or empty"
     
     return True, None
@@ -310,7 +342,11 @@ def validate_required_fields(data: dict, required_fields: list) -> tuple[bool, O
 def validate_field_lengths(data: dict, field_limits: dict) -> tuple[bool, Optional[str]]:
     """Validate field length limits"""
     for field, max_length in field_limits.items():
-        if field in data and data[field] and len(str(data[field])) > max_length:
+        value = data.get(field)
+        if not value:
+            continue
+        length = len(value) if isinstance(value, str) else len(str(value))
+        if length > max_length:
             return False, f"Field '{field}' exceeds maximum length of {max_length} characters"
     
     return True, None
@@ -330,7 +366,7 @@ def sanitize_string(text: str, max_length: int = None) -> str:
         return ""
     
     # Remove potentially harmful characters
-    sanitized = re.sub(r'[<>"\']', '', text)
+    sanitized = _SANITIZE_RE.sub('', text)
     
     # Remove extra whitespace
     sanitized = ' '.join(sanitized.split())
@@ -358,7 +394,7 @@ def validate_future_date(date_to_check: date) -> tuple[bool, Optional[str]]:
     if not isinstance(date_to_check, date):
         return False, "Invalid date format"
     
-    today = date.today()
+    today = get_today()
     max_future = today.replace(year=today.year + 10)  # 10 years in future
     
     if date_to_check > max_future:
@@ -3,99 +3,268 @@ WebSocket manager for real-time communication
 """
 
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
+from typing import Any, DefaultDict, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
 import json
 import logging
 import asyncio
+import itertools
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime
+import orjson
 
 from app.schemas.common import NotificationMessage
+from app.utils.helpers import get_iso_timestamp
+from app.utils.responses import orjson_default
 
 logger = logging.getLogger(__name__)
 
+# Outbound messages buffered per connection; past this the oldest queued message is dropped
+SEND_QUEUE_SIZE = 256
+
+# Seconds a single send may block, with the queue full, before the connection is dropped as stalled
+SEND_STALL_TIMEOUT = 10.0
+
+# Recipients queued to before a fan-out yields so connection writers can drain
+FANOUT_YIELD_EVERY = 64
+
+# Most queued messages the writer combines into a single {"type": "batch"} frame
+SEND_BATCH_SIZE = 32
+
+# Most disconnects (socket closes) run at once when dropping many connections
+DISCONNECT_CONCURRENCY = 256
+
+# Seconds presence changes are collected before one presence_delta goes to staff
+PRESENCE_FLUSH_INTERVAL = 0.25
+
+# Seconds a cached timestamp string is reused for pongs, chat messages and user listings
+TIMESTAMP_RESOLUTION = 0.05
+
+# Seconds get_connection_stats / get_connected_users results are reused while no one connects or leaves
+SNAPSHOT_TTL = 0.5
+
+# Redis pub/sub channels used to fan messages out across worker processes
+BUS_ALL_CHANNEL = "ws:all"
+BUS_USERS_CHANNEL = "ws:users"  # one message for several users, each worker delivers to its own
+BUS_PRESENCE_CHANNEL = "ws:presence"
+BUS_ROLE_CHANNEL = "ws:role:"
+BUS_USER_CHANNEL = "ws:user:"
+
+# Seconds a single Redis command may take before the broadcast bus gives up on it
+BUS_COMMAND_TIMEOUT = 5.0
+
+# Seconds the broadcast bus waits before reconnecting to Redis, doubling up to the maximum
+BUS_RECONNECT_DELAY = 0.5
+BUS_RECONNECT_MAX_DELAY = 30.0
+
+
+@dataclass(slots=True)
+class _WireMessage:
+    """Notification built internally, without pydantic validation.
+
+    Has the same fields as NotificationMessage and encodes to the same JSON.
+    """
+    type: str
+    title: str
+    message: str
+    data: Optional[Dict[str, Any]] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    user_id: Optional[str] = None
+    role: Optional[str] = None
+
+
+AnyNotification = Union[NotificationMessage, _WireMessage]
+
+
+def _encode(message: AnyNotification) -> str:
+    """Serialize a notification to JSON text with orjson"""
+    if isinstance(message, NotificationMessage):
+        message = message.__dict__
+    return orjson.dumps(message, default=orjson_default).decode()
+
+
+def _encode_with_key(message: AnyNotification) -> Tuple[str, Hashable]:
+    """Serialize a notification and identify it by its content, ignoring when it was created"""
+    # data is serialized once, with sorted keys, and reused both for the key and
+    # (as a pre-encoded fragment) in the payload; large payloads are encoded once
+    data = orjson.dumps(message.data, default=orjson_default, option=orjson.OPT_SORT_KEYS)
+    payload = orjson.dumps({
+        "type": message.type,
+        "title": message.title,
+        "message": message.message,
+        "data": orjson.Fragment(data),
+        "timestamp": message.timestamp,
+        "user_id": message.user_id,
+        "role": message.role,
+    }, default=orjson_default).decode()
+    return payload, (message.type, message.title, message.message, message.user_id, message.role, data)
+
+
+def _now_iso() -> str:
+    """Get current UTC time as ISO text, recomputed at most every TIMESTAMP_RESOLUTION"""
+    return get_iso_timestamp(suffix='', resolution=TIMESTAMP_RESOLUTION)
+
+
+def _json(value) -> str:
+    """Serialize a single value to JSON text for filling a message template"""
+    return orjson.dumps(value, default=orjson_default).decode()
+
+
+# Pre-rendered NotificationMessage JSON for the control replies sent most often;
+# only the timestamp or channel varies, so these skip model construction entirely
+_PONG_TEMPLATE = (
+    '{"type":"pong","title":"Pong","message":"Server response to ping",'
+    '"data":{"timestamp":%s},"timestamp":%s,"user_id":null,"role":null}'
+)
+_SUBSCRIBED_TEMPLATE = (
+    '{"type":"subscribed","title":"Subscribed","message":%s,'
+    '"data":{"channel":%s},"timestamp":%s,"user_id":null,"role":null}'
+)
+_UNSUBSCRIBED_TEMPLATE = (
+    '{"type":"unsubscribed","title":"Unsubscribed","message":%s,'
+    '"data":{"channel":%s},"timestamp":%s,"user_id":null,"role":null}'
+)
+
+
+@dataclass(slots=True)
+class ConnectionState:
+    """Everything tracked for a single WebSocket connection"""
+    websocket: WebSocket
+    user_id: str
+    queue: asyncio.Queue  # outbound (dedup key, payload)
+    pending_keys: Set[Hashable] = field(default_factory=set)  # dedup keys queued or being sent
+    writer: Optional[asyncio.Task] = None  # task draining the queue
+    sending_since: Optional[float] = None  # monotonic start of the send in flight, None while idle
+
 
 class ConnectionManager:
     """WebSocket connection manager"""
     
+    __slots__ = (
+        "connections", "user_connections", "user_roles", "role_users", "_connection_ids", "_lock",
+        "_pending_online", "_pending_offline", "_presence_event", "_presence_task", "_tombstones", "_compact_task", "bus",
+        "_stats_cache", "_users_cache",
+    )
+    
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.user_connections: Dict[str, Set[str]] = {}  # user_id -> set of connection_ids
-        self.connection_user: Dict[str, str] = {}  # connection_id -> user_id
+        # Connections are keyed internally by a plain integer id
+        self.connections: Dict[int, ConnectionState] = {}
+        self.user_connections: DefaultDict[str, Set[int]] = defaultdict(set)  # user_id -> set of connection_ids
         self.user_roles: Dict[str, str] = {}  # user_id -> role
-        self.connection_count = 0
+        self.role_users: DefaultDict[str, Set[str]] = defaultdict(set)  # role -> set of user_ids
+        self._connection_ids = itertools.count()
+        # Guards the registries while recipients are collected, so a broadcast never
+        # sees a half-registered or half-removed connection
+        self._lock = asyncio.Lock()
+        # Users (user_id -> role) who came online / went offline since the last presence_delta
+        self._pending_online: Dict[str, Optional[str]] = {}
+        self._pending_offline: Dict[str, Optional[str]] = {}
+        self._presence_event = asyncio.Event()  # set while changes are pending
+        self._presence_task: Optional[asyncio.Task] = None
+        # Connections found too slow during a send, disconnected together afterwards
+        self._tombstones: Set[int] = set()
+        self._compact_task: Optional[asyncio.Task] = None
+        # Cross-worker fan-out; None when this process is the only worker
+        self.bus: Optional["BroadcastBus"] = None
+        # (expires_at, result) for polled listings; dropped whenever a connection is added or removed
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._users_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+    
+    async def start_bus(self, redis_url: str):
+        """Relay broadcasts to and from other worker processes through Redis"""
+        bus = BroadcastBus(self, redis_url)
+        try:
+            await bus.start()
+        except Exception as e:
+            logger.error(f"Failed to start WebSocket broadcast bus, serving local connections only: {str(e)}")
+            return
+        self.bus = bus
+    
+    async def stop_bus(self):
+        """Stop relaying broadcasts between worker processes"""
+        if self.bus is None:
+            return
+        bus, self.bus = self.bus, None
+        await bus.stop()
     
-    async def connect(self, websocket: WebSocket, user_id: str, role: str = None):
-        """Accept and store WebSocket connection"""
+    async def connect(self, websocket: WebSocket, user_id: str, role: str = None) -> int:
+        """Accept and store WebSocket connection, returning its connection id"""
         await websocket.accept()
         
-        connection_id = f"{user_id}_{self.connection_count}"
-        self.active_connections[connection_id] = websocket
-        self.connection_user[connection_id] = user_id
+        async with self._lock:
+            connection_id = next(self._connection_ids)
+            state = ConnectionState(websocket, user_id, asyncio.Queue(maxsize=SEND_QUEUE_SIZE))
+            state.writer = asyncio.create_task(self._writer(connection_id, state))
+            self.connections[connection_id] = state
+            self._invalidate_snapshots()
+            
+            first_connection = user_id not in self.user_connections
+            self.user_connections[user_id].add(connection_id)
+            
+            # Roles are a handful of strings shared by every user; interned, role index
+            # lookups and comparisons mostly short-circuit on identity
+            if role:
+                role = sys.intern(role)
+            if role and self.user_roles.get(user_id) != role:
+                self._remove_user_role(user_id)
+                self.user_roles[user_id] = role
+                self.role_users[role].add(user_id)
         
-        if user_id not in self.user_connections:
-            self.user_connections[user_id] = set()
-        self.user_connections[user_id].add(connection_id)
-        
-        if role:
-            self.user_roles[user_id] = role
-        
-        self.connection_count += 1
+        # Subscribed in the background, so no one waits on Redis
+        if first_connection and self.bus is not None:
+            self.bus.sync_user(user_id)
         
         logger.info(f"WebSocket connected: {connection_id} for user {user_id}")
         
         # Send welcome message
         await self.send_personal_message(
             user_id,
-            NotificationMessage(
+            _WireMessage(
                 type="connection",
                 title="Connected",
                 message="Successfully connected to real-time updates",
-                data={"connection_id": connection_id}
+                data={"connection_id": f"{user_id}:{connection_id}"}
             )
         )
         
         # Notify others about user online status
-        await self.broadcast_to_role(
-            "hospital_staff",
-            NotificationMessage(
-                type="user_online",
-                title="User Online",
-                message=f"User {user_id} is now online",
-                data={"user_id": user_id, "role": role}
-            ),
-            exclude_user=user_id
-        )
+        self._mark_presence(user_id, self.user_roles.get(user_id), online=True)
+        
+        return connection_id
     
-    async def disconnect(self, connection_id: str):
+    async def disconnect(self, connection_id: int, announce: bool = True):
         """Remove WebSocket connection"""
-        if connection_id not in self.active_connections:
-            return
-        
-        user_id = self.connection_user.get(connection_id)
-        websocket = self.active_connections[connection_id]
+        async with self._lock:
+            # Remove connection
+            state = self.connections.pop(connection_id, None)
+            if state is None:
+                return
+            
+            user_id = state.user_id
+            websocket = state.websocket
+            self._invalidate_snapshots()
+            
+            # Stop the writer, unless it is the writer itself disconnecting after a failed send
+            if state.writer is not None and state.writer is not asyncio.current_task():
+                state.writer.cancel()
+            
+            went_offline = False
+            if user_id and user_id in self.user_connections:
+                self.user_connections[user_id].discard(connection_id)
+                if not self.user_connections[user_id]:
+                    del self.user_connections[user_id]
+                    role = self._remove_user_role(user_id)
+                    went_offline = True
         
-        # Remove connection
-        del self.active_connections[connection_id]
-        del self.connection_user[connection_id]
+        if went_offline and self.bus is not None:
+            self.bus.sync_user(user_id)
         
-        if user_id and user_id in self.user_connections:
-            self.user_connections[user_id].discard(connection_id)
-            if not self.user_connections[user_id]:
-                del self.user_connections[user_id]
-                if user_id in self.user_roles:
-                    del self.user_roles[user_id]
-                
-                # Notify others about user offline status
-                await self.broadcast_to_role(
-                    "hospital_staff",
-                    NotificationMessage(
-                        type="user_offline",
-                        title="User Offline",
-                        message=f"User {user_id} is now offline",
-                        data={"user_id": user_id}
-                    ),
-                    exclude_user=user_id
-                )
+        if went_offline and announce:
+            # Notify others about user offline status
+            self._mark_presence(user_id, role, online=False)
         
         try:
             await websocket.close()
@@ -104,73 +273,326 @@ class ConnectionManager:
         
         logger.info(f"WebSocket disconnected: {connection_id} for user {user_id}")
     
-    async def send_personal_message(self, user_id: str, message: NotificationMessage):
+    def _mark_presence(self, user_id: str, role: Optional[str], online: bool):
+        """Record a presence change for the next presence_delta broadcast"""
+        # Connection churn (a reload, a network blip) becomes one message per
+        # interval instead of one broadcast to all staff per user
+        if online:
+            self._pending_offline.pop(user_id, None)
+            self._pending_online[user_id] = role
+        else:
+            self._pending_online.pop(user_id, None)
+            self._pending_offline[user_id] = role
+        
+        self._presence_event.set()
+        if self._presence_task is None or self._presence_task.done():
+            self._presence_task = asyncio.create_task(self._presence_flusher())
+    
+    async def _presence_flusher(self):
+        """Broadcast accumulated presence changes to staff, sleeping while there are none"""
+        while True:
+            await self._presence_event.wait()
+            await asyncio.sleep(PRESENCE_FLUSH_INTERVAL)
+            self._presence_event.clear()
+            
+            online, self._pending_online = self._pending_online, {}
+            offline, self._pending_offline = self._pending_offline, {}
+            try:
+                await self._send_presence_delta(online, offline)
+            except Exception as e:
+                logger.error(f"Error broadcasting presence update: {str(e)}")
+    
+    async def _send_presence_delta(self, online: Dict[str, Optional[str]], offline: Dict[str, Optional[str]]):
+        """Send one presence_delta to staff on every worker"""
+        await self._fan_out_presence(online, offline)
+        # Other workers get the raw changes and build their staff's deltas themselves
+        if self.bus is not None:
+            await self.bus.publish(BUS_PRESENCE_CHANNEL, _json({"online": online, "offline": offline}))
+    
+    async def _fan_out_presence(self, online: Dict[str, Optional[str]], offline: Dict[str, Optional[str]]):
+        """Send a presence_delta to staff on this worker, leaving each staff member's own change out of theirs"""
+        def delta(skip_user: str = None) -> _WireMessage:
+            online_users = [{"user_id": u, "role": r} for u, r in sorted(online.items()) if u != skip_user]
+            offline_users = [{"user_id": u, "role": r} for u, r in sorted(offline.items()) if u != skip_user]
+            return _WireMessage(
+                type="presence_delta",
+                title="Presence Update",
+                message=f"{len(online_users)} user(s) online, {len(offline_users)} user(s) offline",
+                data={"online": online_users, "offline": offline_users}
+            )
+        
+        payload = _encode(delta())
+        async with self._lock:
+            staff = self._users_with_role("hospital_staff")
+            connection_ids = self._connections_of(
+                user_id for user_id in staff if user_id not in online and user_id not in offline
+            )
+            involved_staff = [user_id for user_id in staff if user_id in online or user_id in offline]
+        await self._deliver(connection_ids, payload)
+        
+        # Staff members who are part of the change get the delta without themselves
+        for user_id in involved_staff:
+            message = delta(skip_user=user_id)
+            if message.data["online"] or message.data["offline"]:
+                await self._fan_out_user(user_id, _encode(message))
+    
+    def _remove_user_role(self, user_id: str) -> Optional[str]:
+        """Drop a user's role and its entry in the role index, returning the role"""
+        role = self.user_roles.pop(user_id, None)
+        if role is None:
+            return None
+        
+        users = self.role_users.get(role)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self.role_users[role]
+        return role
+    
+    async def send_personal_message(self, user_id: str, message: AnyNotification):
         """Send message to specific user"""
-        if user_id not in self.user_connections:
+        # A notification identical to one still waiting to go out to the user (e.g. a
+        # retried webhook or a trigger firing twice) is only delivered once
+        await self._send_raw(user_id, *_encode_with_key(message))
+    
+    async def _send_raw(self, user_id: str, payload: str, dedup_key: Optional[Hashable] = None):
+        """Send an already serialized message to specific user"""
+        delivered = await self._fan_out_user(user_id, payload, dedup_key)
+        
+        # The user may also have connections (e.g. another tab) on other workers
+        if self.bus is not None:
+            await self.bus.publish(BUS_USER_CHANNEL + user_id, payload)
+        elif not delivered:
             logger.warning(f"User {user_id} not connected")
-            return
+    
+    async def _fan_out_user(self, user_id: str, payload: str, dedup_key: Optional[Hashable] = None) -> bool:
+        """Send to a user's connections on this worker; False if there are none"""
+        async with self._lock:
+            connection_ids = list(self.user_connections.get(user_id, ()))
         
-        disconnected_connections = set()
-        for connection_id in self.user_connections[user_id]:
-            if connection_id in self.active_connections:
-                websocket = self.active_connections[connection_id]
-                try:
-                    await websocket.send_text(message.json())
-                except Exception as e:
-                    logger.error(f"Error sending message to {connection_id}: {str(e)}")
-                    disconnected_connections.add(connection_id)
+        if not connection_ids:
+            return False
         
-        # Clean up disconnected connections
-        for connection_id in disconnected_connections:
-            await self.disconnect(connection_id)
+        await self._deliver(connection_ids, payload, dedup_key)
+        return True
     
-    async def send_to_connection(self, connection_id: str, message: NotificationMessage):
-        """Send message to specific connection"""
-        if connection_id not in self.active_connections:
-            logger.warning(f"Connection {connection_id} not found")
-            return
+    async def _deliver(self, connection_ids: List[int], payload: str, dedup_key: Optional[Hashable] = None):
+        """Queue payload for a snapshot of connections, marking the stalled ones"""
+        tombstones = self._tombstones
+        for count, connection_id in enumerate(connection_ids, 1):
+            # Already marked: skip until compaction removes it, rather than tripping
+            # over its full queue (and warning) again for every message
+            if connection_id in tombstones:
+                continue
+            if not self._enqueue(connection_id, payload, dedup_key):
+                self._bury(connection_id)
+            if count % FANOUT_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
         
-        websocket = self.active_connections[connection_id]
+        # Enqueueing never blocks, so without this back-to-back broadcasts would fill
+        # the queues before any writer got to run
+        if connection_ids:
+            await asyncio.sleep(0)
+    
+    def _bury(self, connection_id: int):
+        """Mark a connection for disconnection once the current send has finished"""
+        # Sends never await a disconnect inline, so a storm of dead sockets costs one
+        # compaction pass rather than a cleanup per message per connection
+        self._tombstones.add(connection_id)
+        if self._compact_task is None or self._compact_task.done():
+            self._compact_task = asyncio.create_task(self._compact())
+    
+    async def _compact(self):
+        """Disconnect every marked connection in one batch"""
+        while self._tombstones:
+            # Ids stay marked until their disconnect has finished, so sends racing the
+            # cleanup keep skipping them
+            connection_ids = list(self._tombstones)
+            await asyncio.gather(
+                *(self.disconnect(connection_id) for connection_id in connection_ids),
+                return_exceptions=True
+            )
+            self._tombstones.difference_update(connection_ids)
+    
+    def _enqueue(self, connection_id: int, payload: str, dedup_key: Optional[Hashable] = None) -> bool:
+        """Queue payload for a connection's writer; False if the connection has stalled"""
+        state = self.connections.get(connection_id)
+        if state is None:
+            return True
+        
+        pending = state.pending_keys
+        if dedup_key is not None and dedup_key in pending:
+            logger.debug(f"Dropping duplicate message for {connection_id}")
+            return True
+        
+        queue = state.queue
+        if queue.full():
+            # Only a writer stuck in one send for too long means the client is gone;
+            # a healthy client behind a burst just loses its oldest queued message
+            if state.sending_since is not None and time.monotonic() - state.sending_since > SEND_STALL_TIMEOUT:
+                logger.warning(f"Connection {connection_id} stalled with a full send queue, dropping connection")
+                return False
+            
+            dropped_key, _ = queue.get_nowait()
+            pending.discard(dropped_key)
+            logger.debug(f"Send queue full for {connection_id}, dropped oldest message")
+        
+        queue.put_nowait((dedup_key, payload))
+        if dedup_key is not None:
+            pending.add(dedup_key)
+        return True
+    
+    async def _writer(self, connection_id: int, state: ConnectionState):
+        """Send queued payloads to a connection until it is disconnected"""
+        # Hand ASGI send messages straight to WebSocket.send, which keeps Starlette's
+        # state checks but skips the send_text wrapper on every frame
+        send = state.websocket.send
+        queue = state.queue
         try:
-            await websocket.send_text(message.json())
+            while True:
+                dedup_key, payload = await queue.get()
+                sent_keys = [dedup_key]
+                
+                # Messages queued while the previous send was in flight go out as one
+                # frame: {"type":"batch","messages":[...]}, which clients unwrap in order
+                if not queue.empty():
+                    batch = [payload]
+                    while not queue.empty() and len(batch) < SEND_BATCH_SIZE:
+                        dedup_key, payload = queue.get_nowait()
+                        sent_keys.append(dedup_key)
+                        batch.append(payload)
+                    payload = '{"type":"batch","messages":[' + ','.join(batch) + ']}'
+                
+                state.sending_since = time.monotonic()
+                await send({"type": "websocket.send", "text": payload})
+                state.sending_since = None
+                state.pending_keys.difference_update(sent_keys)
         except Exception as e:
             logger.error(f"Error sending message to {connection_id}: {str(e)}")
             await self.disconnect(connection_id)
     
-    async def broadcast_to_role(self, role: str, message: NotificationMessage, exclude_user: str = None):
+    async def send_to_connection(self, connection_id: int, message: AnyNotification):
+        """Send message to specific connection"""
+        await self._send_raw_to_connection(connection_id, _encode(message))
+    
+    async def _send_raw_to_connection(self, connection_id: int, payload: str):
+        """Send an already serialized message to specific connection"""
+        if connection_id not in self.connections:
+            logger.warning(f"Connection {connection_id} not found")
+            return
+        
+        if connection_id not in self._tombstones and not self._enqueue(connection_id, payload):
+            self._bury(connection_id)
+    
+    def _connections_of(self, user_ids: Iterable[str]) -> List[int]:
+        """Get connection ids of the given users; call with the lock held"""
+        return [
+            connection_id
+            for user_id in user_ids
+            for connection_id in self.user_connections.get(user_id, ())
+        ]
+    
+    async def _broadcast(self, user_ids: Iterable[str], payload: str, exclude_user: str = None):
+        """Send an already serialized message to several users"""
+        user_ids = [user_id for user_id in user_ids if user_id != exclude_user]
+        await self._fan_out_users(user_ids, payload)
+        
+        # Other workers get a single message naming every recipient
+        if self.bus is not None and user_ids:
+            await self.bus.publish(BUS_USERS_CHANNEL, payload, recipients=user_ids)
+    
+    async def _fan_out_users(self, user_ids: Iterable[str], payload: str):
+        """Send to several users' connections on this worker"""
+        # Recipients are collected under the lock and sent to outside it; sends only
+        # enqueue, so a slow client no longer holds up the others
+        async with self._lock:
+            connection_ids = self._connections_of(user_ids)
+        await self._deliver(connection_ids, payload)
+    
+    def _users_with_role(self, role: str, exclude_user: str = None) -> List[str]:
+        """Get connected users with specific role"""
+        return [user_id for user_id in self.role_users.get(role, ()) if user_id != exclude_user]
+    
+    async def broadcast_to_role(self, role: str, message: AnyNotification, exclude_user: str = None):
         """Broadcast message to all users with specific role"""
-        for user_id, user_role in self.user_roles.items():
-            if user_role == role and user_id != exclude_user:
-                await self.send_personal_message(user_id, message)
+        await self._broadcast_role(role, _encode(message), exclude_user)
+    
+    async def _broadcast_role(self, role: str, payload: str, exclude_user: str = None):
+        """Send an already serialized message to a role on every worker"""
+        await self._fan_out_role(role, payload, exclude_user)
+        if self.bus is not None:
+            await self.bus.publish(BUS_ROLE_CHANNEL + role, payload, exclude_user)
+    
+    async def _fan_out_role(self, role: str, payload: str, exclude_user: str = None):
+        """Send to a role's connections on this worker"""
+        async with self._lock:
+            connection_ids = self._connections_of(self._users_with_role(role, exclude_user))
+        await self._deliver(connection_ids, payload)
     
-    async def broadcast_to_all(self, message: NotificationMessage, exclude_user: str = None):
+    async def broadcast_to_all(self, message: AnyNotification, exclude_user: str = None):
         """Broadcast message to all connected users"""
-        for user_id in self.user_connections:
-            if user_id != exclude_user:
-                await self.send_personal_message(user_id, message)
+        payload = _encode(message)
+        await self._fan_out_all(payload, exclude_user)
+        if self.bus is not None:
+            await self.bus.publish(BUS_ALL_CHANNEL, payload, exclude_user)
     
-    async def broadcast_to_users(self, user_ids: List[str], message: NotificationMessage):
+    async def _fan_out_all(self, payload: str, exclude_user: str = None):
+        """Send to every connection on this worker"""
+        async with self._lock:
+            connection_ids = [
+                connection_id for connection_id, state in self.connections.items()
+                if state.user_id != exclude_user
+            ]
+        await self._deliver(connection_ids, payload)
+    
+    async def broadcast_to_users(self, user_ids: List[str], message: AnyNotification, exclude_user: str = None):
         """Broadcast message to specific users"""
-        for user_id in user_ids:
-            await self.send_personal_message(user_id, message)
+        await self._broadcast(user_ids, _encode(message), exclude_user)
     
     async def disconnect_user(self, user_id: str):
         """Disconnect all connections for a user"""
         if user_id not in self.user_connections:
             return
         
-        connection_ids = list(self.user_connections[user_id])
-        for connection_id in connection_ids:
-            await self.disconnect(connection_id)
+        await self._disconnect_many(list(self.user_connections[user_id]))
     
     async def disconnect_all(self):
         """Disconnect all connections"""
-        connection_ids = list(self.active_connections.keys())
-        for connection_id in connection_ids:
-            await self.disconnect(connection_id)
+        # Nobody is left to tell about users going offline during shutdown
+        await self._disconnect_many(list(self.connections.keys()), announce=False)
+        
+        if self._presence_task is not None:
+            self._presence_task.cancel()
+            self._presence_task = None
+        self._pending_online.clear()
+        self._pending_offline.clear()
+        self._presence_event.clear()
+    
+    async def _disconnect_many(self, connection_ids: List[int], announce: bool = True):
+        """Disconnect several connections concurrently, with bounded concurrency"""
+        semaphore = asyncio.Semaphore(DISCONNECT_CONCURRENCY)
+        
+        async def disconnect_one(connection_id: int):
+            async with semaphore:
+                await self.disconnect(connection_id, announce=announce)
+        
+        await asyncio.gather(
+            *(disconnect_one(connection_id) for connection_id in connection_ids),
+            return_exceptions=True
+        )
+    
+    def _invalidate_snapshots(self):
+        """Force the next stats and user listing to be recomputed"""
+        self._stats_cache = None
+        self._users_cache = None
     
     def get_connected_users(self) -> List[Dict[str, any]]:
         """Get list of connected users"""
+        now = time.monotonic()
+        # Callers get copies so mutating a result cannot change the cached snapshot
+        if self._users_cache is not None and now < self._users_cache[0]:
+            return [dict(user) for user in self._users_cache[1]]
+        
         users = []
         for user_id, connections in self.user_connections.items():
             role = self.user_roles.get(user_id)
@@ -178,11 +600,12 @@ class ConnectionManager:
                 "user_id": user_id,
                 "role": role,
                 "connections": len(connections),
-                "connected_at": datetime.utcnow().isoformat()
+                "connected_at": _now_iso()
             })
-        return users
+        self._users_cache = (now + SNAPSHOT_TTL, users)
+        return [dict(user) for user in users]
     
-    def get_user_connections(self, user_id: str) -> List[str]:
+    def get_user_connections(self, user_id: str) -> List[int]:
         """Get connection IDs for a user"""
         return list(self.user_connections.get(user_id, set()))
     
@@ -192,24 +615,187 @@ class ConnectionManager:
     
     def get_connection_stats(self) -> Dict[str, int]:
         """Get connection statistics"""
-        return {
-            "total_connections": len(self.active_connections),
-            "unique_users": len(self.user_connections),
-            "connections_by_role": self._get_connections_by_role()
-        }
+        now = time.monotonic()
+        if self._stats_cache is None or now >= self._stats_cache[0]:
+            self._stats_cache = (now + SNAPSHOT_TTL, {
+                "total_connections": len(self.connections),
+                "unique_users": len(self.user_connections),
+                "connections_by_role": self._get_connections_by_role()
+            })
+        
+        # Copy so callers cannot change the cached snapshot
+        stats = self._stats_cache[1]
+        return {**stats, "connections_by_role": dict(stats["connections_by_role"])}
     
     def _get_connections_by_role(self) -> Dict[str, int]:
         """Get connection count by role"""
-        role_counts = {}
-        for user_id, role in self.user_roles.items():
-            role_counts[role] = role_counts.get(role, 0) + len(self.user_connections[user_id])
-        return role_counts
+        return {
+            role: sum(len(self.user_connections[user_id]) for user_id in users)
+            for role, users in self.role_users.items()
+        }
 
 
 # Global connection manager instance
 websocket_manager = ConnectionManager()
 
 
+class BroadcastBus:
+    """Redis pub/sub relay that lets each worker process serve its own connections"""
+    
+    def __init__(self, manager: ConnectionManager, redis_url: str):
+        self.manager = manager
+        self.redis_url = redis_url
+        # Tags published messages so a worker skips the ones it already delivered locally
+        self.worker_id = uuid.uuid4().hex
+        self._redis = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        # Serializes changes to the pub/sub subscriptions; never held with the manager lock
+        self._lock = asyncio.Lock()
+        self._subscribed: Set[str] = set()  # users whose personal channel is subscribed
+        self._unsynced_users: Set[str] = set()  # users who connected or left since the last sync
+        self._sync_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Connect to Redis and start relaying messages to local connections"""
+        import redis.asyncio as aioredis
+        
+        self._redis = aioredis.from_url(self.redis_url, socket_connect_timeout=BUS_COMMAND_TIMEOUT)
+        await self._subscribe()
+        self._listener = asyncio.create_task(self._listen())
+    
+    async def _subscribe(self):
+        """Open a pub/sub connection subscribed to the shared and local users' channels"""
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await asyncio.wait_for(
+            pubsub.subscribe(BUS_ALL_CHANNEL, BUS_USERS_CHANNEL, BUS_PRESENCE_CHANNEL), BUS_COMMAND_TIMEOUT
+        )
+        await asyncio.wait_for(pubsub.psubscribe(BUS_ROLE_CHANNEL + "*"), BUS_COMMAND_TIMEOUT)
+        
+        # Under the bus lock, so no subscription change lands on the old connection
+        # between listing the local users and switching over
+        async with self._lock:
+            user_ids = set(self.manager.user_connections)
+            if user_ids:
+                await asyncio.wait_for(
+                    pubsub.subscribe(*(BUS_USER_CHANNEL + user_id for user_id in user_ids)), BUS_COMMAND_TIMEOUT
+                )
+            self._pubsub = pubsub
+            self._subscribed = user_ids
+    
+    async def stop(self):
+        """Stop relaying and close the Redis connection"""
+        for task in (self._listener, self._sync_task):
+            if task is not None:
+                task.cancel()
+        self._listener = None
+        self._sync_task = None
+        try:
+            await self._pubsub.aclose()
+            await self._redis.aclose()
+        except Exception as e:
+            logger.error(f"Error closing WebSocket broadcast bus: {str(e)}")
+    
+    def sync_user(self, user_id: str):
+        """Queue a user's personal channel to be (un)subscribed to match whether they are connected here"""
+        self._unsynced_users.add(user_id)
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_users())
+    
+    async def _sync_users(self):
+        """Bring personal channel subscriptions in line with the users connected to this worker"""
+        while self._unsynced_users:
+            user_ids, self._unsynced_users = self._unsynced_users, set()
+            async with self._lock:
+                # Decided from the current state, so a connect and disconnect in quick succession net out
+                connected = {user_id for user_id in user_ids if user_id in self.manager.user_connections}
+                subscribe = connected - self._subscribed
+                unsubscribe = (user_ids - connected) & self._subscribed
+                try:
+                    if subscribe:
+                        await asyncio.wait_for(
+                            self._pubsub.subscribe(*(BUS_USER_CHANNEL + user_id for user_id in subscribe)),
+                            BUS_COMMAND_TIMEOUT
+                        )
+                        self._subscribed |= subscribe
+                    if unsubscribe:
+                        await asyncio.wait_for(
+                            self._pubsub.unsubscribe(*(BUS_USER_CHANNEL + user_id for user_id in unsubscribe)),
+                            BUS_COMMAND_TIMEOUT
+                        )
+                        self._subscribed -= unsubscribe
+                except asyncio.TimeoutError:
+                    logger.error("Timed out updating personal message subscriptions")
+                except Exception as e:
+                    # The listener resubscribes every local user when it reconnects
+                    logger.error(f"Error updating personal message subscriptions: {str(e)}")
+    
+    async def publish(self, channel: str, payload: str, exclude_user: str = None, recipients: List[str] = None):
+        """Publish an already serialized message for the other workers"""
+        # The second line carries the excluded user or, on BUS_USERS_CHANNEL, the recipients
+        header = _json(recipients) if recipients is not None else exclude_user or ''
+        try:
+            await asyncio.wait_for(
+                self._redis.publish(channel, f"{self.worker_id}\n{header}\n{payload}"), BUS_COMMAND_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out publishing to {channel}")
+        except Exception as e:
+            logger.error(f"Error publishing to {channel}: {str(e)}")
+    
+    async def _listen(self):
+        """Deliver messages published by other workers, reconnecting if Redis fails"""
+        delay = BUS_RECONNECT_DELAY
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    delay = BUS_RECONNECT_DELAY
+                    await self._relay(message)
+                logger.error("WebSocket broadcast bus subscription ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket broadcast bus connection failed: {str(e)}")
+            
+            # Messages published while disconnected are lost; local delivery carries on
+            while True:
+                logger.info(f"Reconnecting WebSocket broadcast bus in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, BUS_RECONNECT_MAX_DELAY)
+                try:
+                    await self._pubsub.aclose()
+                except Exception:
+                    pass
+                try:
+                    await self._subscribe()
+                    break
+                except Exception as e:
+                    logger.error(f"Error reconnecting WebSocket broadcast bus: {str(e)}")
+    
+    async def _relay(self, message: dict):
+        """Deliver one message published by another worker to local connections"""
+        try:
+            origin, header, payload = message["data"].decode().split("\n", 2)
+            if origin == self.worker_id:
+                return
+            
+            channel = message["channel"].decode()
+            if channel == BUS_ALL_CHANNEL:
+                await self.manager._fan_out_all(payload, header or None)
+            elif channel == BUS_USERS_CHANNEL:
+                await self.manager._fan_out_users(orjson.loads(header), payload)
+            elif channel == BUS_PRESENCE_CHANNEL:
+                changes = orjson.loads(payload)
+                await self.manager._fan_out_presence(changes["online"], changes["offline"])
+            elif channel.startswith(BUS_ROLE_CHANNEL):
+                role = sys.intern(channel[len(BUS_ROLE_CHANNEL):])
+                await self.manager._fan_out_role(role, payload, header or None)
+            elif channel.startswith(BUS_USER_CHANNEL):
+                await self.manager._fan_out_user(channel[len(BUS_USER_CHANNEL):], payload)
+        except Exception as e:
+            logger.error(f"Error relaying broadcast message: {str(e)}")
+
+
 class WebSocketMessageHandler:
     """Handler for different types of WebSocket messages"""
     
@@ -223,7 +809,7 @@ class WebSocketMessageHandler:
             "chat": self._handle_chat_message
         }
     
-    async def handle_message(self, connection_id: str, user_id: str, message: dict):
+    async def handle_message(self, connection_id: int, user_id: str, message: dict):
         """Route message to appropriate handler"""
         message_type = message.get("type", "unknown")
         handler = self.handlers.get(message_type)
@@ -236,58 +822,45 @@ class WebSocketMessageHandler:
         else:
             logger.warning(f"Unknown message type: {message_type}")
     
-    async def _handle_ping(self, connection_id: str, user_id: str, message: dict):
+    async def _handle_ping(self, connection_id: int, user_id: str, message: dict):
         """Handle ping messages"""
-        await self.connection_manager.send_to_connection(
-            connection_id,
-            NotificationMessage(
-                type="pong",
-                title="Pong",
-                message="Server response to ping",
-                data={"timestamp": datetime.utcnow().isoformat()}
-            )
-        )
+        now = _json(_now_iso())
+        await self.connection_manager._send_raw_to_connection(connection_id, _PONG_TEMPLATE % (now, now))
     
-    async def _handle_subscribe(self, connection_id: str, user_id: str, message: dict):
+    async def _handle_subscribe(self, connection_id: int, user_id: str, message: dict):
         """Handle subscription messages"""
         channel = message.get("channel")
         if not channel:
             return
         
         # Store subscription (implement subscription logic as needed)
-        await self.connection_manager.send_to_connection(
+        await self.connection_manager._send_raw_to_connection(
             connection_id,
-            NotificationMessage(
-                type="subscribed",
-                title="Subscribed",
-                message=f"Subscribed to {channel}",
-                data={"channel": channel}
+            _SUBSCRIBED_TEMPLATE % (
+                _json(f"Subscribed to {channel}"), _json(channel), _json(_now_iso())
             )
         )
     
-    async def _handle_unsubscribe(self, connection_id: str, user_id: str, message: dict):
+    async def _handle_unsubscribe(self, connection_id: int, user_id: str, message: dict):
         """Handle unsubscribe messages"""
         channel = message.get("channel")
         if not channel:
             return
         
         # Remove subscription (implement unsubscribe logic as needed)
-        await self.connection_manager.send_to_connection(
+        await self.connection_manager._send_raw_to_connection(
             connection_id,
-            NotificationMessage(
-                type="unsubscribed",
-                title="Unsubscribed",
-                message=f"Unsubscribed from {channel}",
-                data={"channel": channel}
+            _UNSUBSCRIBED_TEMPLATE % (
+                _json(f"Unsubscribed from {channel}"), _json(channel), _json(_now_iso())
             )
         )
     
-    async def _handle_typing(self, connection_id: str, user_id: str, message: dict):
+    async def _handle_typing(self, connection_id: int, user_id: str, message: dict):
         """Handle typing indicators"""
         # Broadcast typing indicator to relevant users
         await self.connection_manager.broadcast_to_users(
             message.get("recipients", []),
-            NotificationMessage(
+            _WireMessage(
                 type="typing",
                 title="Typing",
                 message=f"{user_id} is typing...",
@@ -296,7 +869,7 @@ class WebSocketMessageHandler:
             exclude_user=user_id
         )
     
-    async def _handle_chat_message(self, connection_id: str, user_id: str, message: dict):
+    async def _handle_chat_message(self, connection_id: int, user_id: str, message: dict):
         """Handle chat messages"""
         content = message.get("content")
         recipients = message.get("recipients", [])
@@ -304,14 +877,14 @@ class WebSocketMessageHandler:
         if not content:
             return
         
-        chat_message = NotificationMessage(
+        chat_message = _WireMessage(
             type="chat",
             title="New Message",
             message=content,
             data={
                 "sender_id": user_id,
                 "content": content,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso()
             }
         )
         
@@ -327,7 +900,7 @@ message_handler = WebSocketMessageHandler(websocket_manager)
 
 async def send_system_notification(message: str, notification_type: str = "system", target_roles: List[str] = None):
     """Send system-wide notification"""
-    notification = NotificationMessage(
+    notification = _WireMessage(
         type=notification_type,
         title="System Notification",
         message=message,
@@ -335,15 +908,17 @@ async def send_system_notification(message: str, notification_type: str = "syste
     )
     
     if target_roles:
+        # Serialize once for every targeted role
+        payload = _encode(notification)
         for role in target_roles:
-            await websocket_manager.broadcast_to_role(role, notification)
+            await websocket_manager._broadcast_role(role, payload)
     else:
         await websocket_manager.broadcast_to_all(notification)
 
 
 async def send_appointment_notification(user_id: str, appointment_data: dict):
     """Send appointment-related notification"""
-    notification = NotificationMessage(
+    notification = _WireMessage(
         type="appointment",
         title="Appointment Update",
         message=appointment_data.get("message", "Your appointment has been updated"),
@@ -354,7 +929,7 @@ async def send_appointment_notification(user_id: str, appointment_data: dict):
 
 async def send_prescription_notification(user_id: str, prescription_data: dict):
     """Send prescription-related notification"""
-    notification = NotificationMessage(
+    notification = _WireMessage(
         type="prescription",
         title="Prescription Update",
         message=prescription_data.get("message", "Your prescription has been updated"),
@@ -365,7 +940,7 @@ async def send_prescription_notification(user_id: str, prescription_data: dict):
 
 async def send_order_notification(role: str, order_data: dict):
     """Send order-related notification to staff"""
-    notification = NotificationMessage(
+    notification = _WireMessage(
         type="order",
         title="New Order",
         message=order_data.get("message", "A new order has been placed"),
@@ -376,7 +951,7 @@ async def send_order_notification(role: str, order_data: dict):
 
 async def send_inventory_alert(role: str, inventory_data: dict):
     """Send inventory-related notification"""
-    notification = NotificationMessage(
+    notification = _WireMessage(
         type="inventory",
         title="Inventory Alert",
         message=inventory_data.get("message", "Inventory alert"),